@@ -6,48 +6,190 @@ Light runner for FusionCraft simulation project.
 Usage examples:
   python run_sim.py
   python run_sim.py --time 10 --dt 0.01 --out results.csv
+  python run_sim.py --no-plot
 """
 
 import argparse
 import importlib
+import importlib.util
+import inspect
 import os
 import sys
 from datetime import datetime
 
+# function names tried when a module does not define ENTRYPOINT
+ENTRYPOINT_NAMES = ("run_simulation", "run", "simulate", "main")
 # default output
 DEFAULT_OUT = "fusioncraft_run.csv"
+# number format used for numeric CSV columns
+CSV_FLOAT_FMT = "%.10g"
+# float32 tables only carry ~7 significant digits
+CSV_FLOAT32_FMT = "%.7g"
+# rows formatted per write() call on the numeric CSV path
+CSV_CHUNK_ROWS = 8192
 
 def try_call_sim(mod):
     """
-    Try common entrypoint names in the provided module.
+    Return the module's ENTRYPOINT if it declares one, else try common
+    entrypoint names in the provided module.
     Expecting function signature like:
       result = fn(total_time, dt)
     Or fn() that returns a dict-like timeseries.
     """
-    candidates = ["run_simulation", "run", "simulate", "main"]
-    for name in candidates:
+    fn = getattr(mod, "ENTRYPOINT", None)
+    if callable(fn):
+        return getattr(fn, "__name__", "ENTRYPOINT"), fn
+    for name in ENTRYPOINT_NAMES:
         fn = getattr(mod, name, None)
         if callable(fn):
             return name, fn
     return None, None
 
+def _numeric_table(cols):
+    """
+    Stack equal-length 1-D float columns into a (rows, cols) float array
+    (float32 when every column is float32, float64 otherwise).
+    Returns None when any column is ragged, nested or not floating point;
+    bool and integer columns go through _format_mixed, since %.10g would
+    print True as 1 and round large integers.
+    """
+    import numpy as np
+    try:
+        arrs = [np.asarray(v) for v in cols]
+    except Exception:
+        return None
+    if not arrs or any(a.ndim != 1 or a.dtype.kind != "f" for a in arrs):
+        return None
+    if len({a.shape[0] for a in arrs}) != 1:
+        return None
+    dtype = np.float32 if all(a.dtype == np.float32 for a in arrs) else np.float64
+    return np.column_stack(arrs).astype(dtype, copy=False)
+
+def _write_rows(fh, arr, fmt=CSV_FLOAT_FMT, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Write a 2-D float array as CSV rows to a binary file handle.
+    Each block of chunk_rows rows is formatted with a single bytes
+    %-operation over the flattened block, so memory stays bounded and no
+    intermediate str is encoded.
+    """
+    row_fmt = b",".join([fmt.encode()] * arr.shape[1]) + b"\n"
+    for start in range(0, arr.shape[0], chunk_rows):
+        block = arr[start:start + chunk_rows]
+        fh.write((row_fmt * block.shape[0]) % tuple(block.ravel().tolist()))
+
+def _needs_quoting(values):
+    """True if any value would need csv-module quoting (or is None)."""
+    for v in values:
+        if v is None:
+            return True
+        text = v if isinstance(v, str) else str(v)
+        if "," in text or '"' in text or "\n" in text or "\r" in text:
+            return True
+    return False
+
+def _format_mixed(cols):
+    """
+    Format equal-length mixed numeric/text columns as CSV body text with
+    one row template (float columns use CSV_FLOAT_FMT, others %s).
+    Returns None when the columns are ragged or a cell needs quoting,
+    in which case the csv module has to handle the table.
+    """
+    import numpy as np
+    if len({len(c) for c in cols}) != 1:
+        return None
+    fmts = []
+    for c in cols:
+        try:
+            arr = np.asarray(c)
+        except Exception:
+            return None
+        if arr.ndim == 1 and arr.dtype.kind == "f":
+            fmts.append(CSV_FLOAT_FMT)
+        elif _needs_quoting(c):
+            return None
+        else:
+            fmts.append("%s")
+    row_fmt = ",".join(fmts) + "\n"
+    return "".join([row_fmt % row for row in zip(*cols)])
+
+def accepts_kwarg(fn, name):
+    """True if fn declares a parameter called name (or takes **kwargs)."""
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == name or p.kind is p.VAR_KEYWORD for p in params)
+
+def accepts_time_dt(fn):
+    """
+    True if fn can be called as fn(total_time, dt), decided from its
+    signature rather than by catching TypeError from a real call.
+    """
+    try:
+        sig = inspect.signature(fn)
+    except (TypeError, ValueError):
+        # no introspectable signature: assume the documented form
+        return True
+    try:
+        sig.bind(0.0, 0.0)
+    except TypeError:
+        return False
+    return True
+
+def records_to_columns(records):
+    """
+    Transpose a list of per-step dicts ([{"t": ..., "T": ...}, ...]) into
+    one column per key (structure of arrays) so it can take the same CSV
+    and plot paths as a dict of series. Returns None unless records is a
+    non-empty list/tuple of mappings that all have the first record's keys.
+    """
+    if not isinstance(records, (list, tuple)) or not records:
+        return None
+    if not all(hasattr(r, "items") for r in records):
+        return None
+    try:
+        return {k: [r[k] for r in records] for k in records[0].keys()}
+    except KeyError:
+        return None
+
 def save_timeseries_csv(ts, filename):
     """
     Accepts dict-like timeseries { 'time': [...], 'var1':[...], ... }
     Writes CSV where first column is time (if present) or index.
+    Numeric columns of equal length are formatted in bulk and other
+    equal-length tables with a single row template; the csv module is only
+    used for ragged columns or cells that need quoting.
     """
     try:
-        import csv
+        import numpy as np
         # determine keys and length
         if hasattr(ts, "items"):
             keys = list(ts.keys())
-            length = len(next(iter(ts.values())))
-            with open(filename, "w", newline="") as fh:
-                writer = csv.writer(fh)
-                writer.writerow(keys)
-                for i in range(length):
-                    row = [ts[k][i] if i < len(ts[k]) else "" for k in keys]
-                    writer.writerow(row)
+            cols = list(ts.values())
+            header = (",".join(map(str, keys)) + "\n").encode()
+            arr = body = None
+            if not _needs_quoting(keys):
+                arr = _numeric_table(cols)
+                if arr is None:
+                    body = _format_mixed(cols)
+            if arr is not None:
+                with open(filename, "wb") as fh:
+                    fh.write(header)
+                    fmt = CSV_FLOAT32_FMT if arr.dtype == np.float32 else CSV_FLOAT_FMT
+                    _write_rows(fh, arr, fmt)
+            elif body is not None:
+                with open(filename, "wb") as fh:
+                    fh.write(header)
+                    fh.write(body.encode())
+            else:
+                import csv
+                length = len(cols[0])
+                with open(filename, "w", newline="") as fh:
+                    writer = csv.writer(fh)
+                    writer.writerow(keys)
+                    for i in range(length):
+                        row = [ts[k][i] if i < len(ts[k]) else "" for k in keys]
+                        writer.writerow(row)
         else:
             # fallback: try pandas
             import pandas as pd
@@ -58,6 +200,10 @@ def save_timeseries_csv(ts, filename):
         print("[ERR] Failed to save CSV:", e)
 
 def simple_plot(ts, filename=None):
+    # probe without importing: matplotlib is the slowest import in the runner
+    if importlib.util.find_spec("matplotlib") is None:
+        print("[WARN] Plot not created (matplotlib missing)")
+        return
     try:
         import matplotlib.pyplot as plt
         if hasattr(ts, "items"):
@@ -92,6 +238,13 @@ def main():
     parser.add_argument("--dt", type=float, default=0.01, help="Time step (s)")
     parser.add_argument("--out", "-o", default=DEFAULT_OUT, help="CSV output file")
     parser.add_argument("--module", "-m", default="src.sim.main", help="Module path to simulation main")
+    parser.add_argument("--dtype", choices=("f32", "f64"), default="f64",
+                        help="Storage precision of the returned series (if the entrypoint supports it)")
+    parser.add_argument("--rtol", type=float, default=None,
+                        help="Use adaptive steps at this relative tolerance (if the entrypoint supports it)")
+    parser.add_argument("--method", choices=("rk4", "implicit"), default=None,
+                        help="Integrator: explicit RK4 or implicit SDIRK2 for stiff cases (if the entrypoint supports it)")
+    parser.add_argument("--no-plot", action="store_true", help="Skip the PNG plot (and the matplotlib import)")
     args = parser.parse_args()
 
     # make sure repo root is on sys.path (so imports work)
@@ -110,20 +263,34 @@ def main():
     name, fn = try_call_sim(sim_mod)
     if fn is None:
         print("[ERR] No suitable entrypoint found in module.")
-        print("Looked for functions:", ["run_simulation","run","simulate","main"])
+        print("Looked for ENTRYPOINT and functions:", list(ENTRYPOINT_NAMES))
         print("Open src/sim/main.py and add a function `def run_simulation(total_time, dt):` that returns a dict of timeseries.")
         sys.exit(1)
 
-    print(f"[RUNNER] Found function '{name}'. Calling it with total_time={args.time}, dt={args.dt} ...")
+    if accepts_time_dt(fn):
+        print(f"[RUNNER] Found function '{name}'. Calling it with total_time={args.time}, dt={args.dt} ...")
+        call_args = (args.time, args.dt)
+    else:
+        print(f"[RUNNER] Found function '{name}'. Calling it without arguments ...")
+        call_args = ()
+    call_kwargs = {}
+    if args.dtype == "f32":
+        if accepts_kwarg(fn, "dtype"):
+            call_kwargs["dtype"] = "float32"
+        else:
+            print(f"[WARN] '{name}' has no dtype parameter; ignoring --dtype {args.dtype}")
+    if args.rtol is not None:
+        if accepts_kwarg(fn, "rtol"):
+            call_kwargs["rtol"] = args.rtol
+        else:
+            print(f"[WARN] '{name}' has no rtol parameter; ignoring --rtol {args.rtol}")
+    if args.method is not None:
+        if accepts_kwarg(fn, "method"):
+            call_kwargs["method"] = args.method
+        else:
+            print(f"[WARN] '{name}' has no method parameter; ignoring --method {args.method}")
     try:
-        # try call with (time, dt)
-        res = fn(args.time, args.dt)
-    except TypeError:
-        try:
-            res = fn()
-        except Exception as e:
-            print("[ERR] Calling function failed:", e)
-            sys.exit(1)
+        res = fn(*call_args, **call_kwargs)
     except Exception as e:
         print("[ERR] Simulation error:", e)
         sys.exit(1)
@@ -138,11 +305,16 @@ def main():
         print(f"[OK] Simulation produced file: {res}")
         sys.exit(0)
 
+    # per-step records are transposed once into columns
+    if not hasattr(res, "items"):
+        res = records_to_columns(res) or res
+
     # Assume returned timeseries-like dict
     if hasattr(res, "items"):
         save_timeseries_csv(res, args.out)
         # try plotting
-        simple_plot(res, filename=os.path.splitext(args.out)[0] + ".png")
+        if not args.no_plot:
+            simple_plot(res, filename=os.path.splitext(args.out)[0] + ".png")
         print("[DONE] Runner finished successfully.")
     else:
         print("[WARN] Simulation returned unexpected type:", type(res))
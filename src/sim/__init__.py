@@ -1,2 +1,2 @@
 # package marker for sim
-__all__ = ["integrator", "physics_base", "fusion_module", "em_module", "control"]
+__all__ = ["integrator", "integrator_numba", "physics_base", "fusion_module", "em_module", "control"]
@@ -1,41 +1,112 @@
 # -------------------------------------------------------------------
-# PID compatibility shim (ensures runner can import PID class)
+# PID controller
 # -------------------------------------------------------------------
 
-if "PID" not in globals():
-    class PID:
-        """
-        Minimal safe PID class:
-        PID(kp, ki, kd).step(setpoint, measured, dt) -> float
-        """
+import math
+import numpy as np
+
+__all__ = ["PID"]
+
+
+class PID:
+    """
+    Minimal safe PID class:
+    PID(kp, ki, kd, integrator_limit=None).step(setpoint, measured, dt) -> float
+    The integral term is clamped to [-integrator_limit, integrator_limit]
+    (unbounded when None).
+    """
+
+    def __init__(self, kp=1.0, ki=0.0, kd=0.0, integrator_limit=None):
+        # gains live in one tuple so step() unpacks them with a single lookup
+        self._K = (float(kp), float(ki), float(kd))
+        # clamp bounds precomputed once; +/-inf makes the clamp a no-op
+        limit = math.inf if integrator_limit is None else abs(float(integrator_limit))
+        self._lim_lo = -limit
+        self._lim_hi = limit
+        self._integral = 0.0
+        self._prev_error = None
+
+    @property
+    def integrator_limit(self):
+        return self._lim_hi
+
+    @property
+    def kp(self):
+        return self._K[0]
+
+    @kp.setter
+    def kp(self, value):
+        self._K = (float(value), self._K[1], self._K[2])
+
+    @property
+    def ki(self):
+        return self._K[1]
 
-        def __init__(self, kp=1.0, ki=0.0, kd=0.0):
-            self.kp = float(kp)
-            self.ki = float(ki)
-            self.kd = float(kd)
-            self._integral = 0.0
-            self._prev_error = None
+    @ki.setter
+    def ki(self, value):
+        self._K = (self._K[0], float(value), self._K[2])
 
-        def step(self, setpoint, measured, dt):
-            try:
-                dt = float(dt)
-            except Exception:
-                dt = 1.0
+    @property
+    def kd(self):
+        return self._K[2]
 
-            err = float(setpoint - measured)
+    @kd.setter
+    def kd(self, value):
+        self._K = (self._K[0], self._K[1], float(value))
+
+    def step(self, setpoint, measured, dt):
+        try:
+            dt = float(dt)
+        except Exception:
+            dt = 1.0
+
+        err = float(setpoint - measured)
+
+        if self._prev_error is None:
+            dedt = 0.0
+        else:
+            dedt = (err - self._prev_error) / dt if dt > 0 else 0.0
+
+        # unconditional clamp: no branch on whether a limit is configured
+        self._integral = min(max(self._integral + err * dt, self._lim_lo), self._lim_hi)
+        self._prev_error = err
+
+        Kp, Ki, Kd = self._K
+        output = Kp * err + Ki * self._integral + Kd * dedt
+
+        return float(output)
+
+    def step_series(self, setpoint, measured, dt):
+        """
+        Same as calling step(setpoint, m, dt) for every m in measured, but
+        vectorized over the whole series (valid whenever the output is not
+        fed back into measured). Returns the outputs as an array and leaves
+        the controller in the state the loop would have left it in.
+        """
+        dt = float(dt)
+        err = setpoint - np.asarray(measured, dtype=float)
+        if err.size == 0:
+            return err
 
-            if self._prev_error is None:
-                dedt = 0.0
-            else:
-                dedt = (err - self._prev_error) / dt if dt > 0 else 0.0
+        dedt = np.zeros_like(err)
+        if dt > 0:
+            if self._prev_error is not None:
+                dedt[0] = (err[0] - self._prev_error) / dt
+            np.subtract(err[1:], err[:-1], out=dedt[1:])
+            dedt[1:] /= dt
 
-            self._integral += err * dt
-            self._prev_error = err
+        if math.isinf(self._lim_hi):
+            # sequential accumulate: same additions, same rounding as step()
+            integral = np.cumsum(np.concatenate(([self._integral], err * dt)))[1:]
+        else:
+            integral = np.empty_like(err)
+            acc = self._integral
+            for i, e in enumerate((err * dt).tolist()):
+                acc = min(max(acc + e, self._lim_lo), self._lim_hi)
+                integral[i] = acc
 
-            output = (
-                self.kp * err +
-                self.ki * self._integral +
-                self.kd * dedt
-            )
+        self._integral = float(integral[-1])
+        self._prev_error = float(err[-1])
 
-            return float(output)
+        Kp, Ki, Kd = self._K
+        return Kp * err + Ki * integral + Kd * dedt
@@ -1,6 +1,14 @@
 import numpy as np
 from .physics_base import Module
 
+__all__ = ["EMOscillator", "EMFieldOscillator"]
+
+# Resolved once at import instead of on every step() call
+try:
+    from .integrator import rk4_step_inplace
+except ImportError:
+    rk4_step_inplace = None
+
 class EMOscillator(Module):
     """
     Simple harmonic oscillator model for an EM mode:
@@ -14,25 +22,26 @@ class EMOscillator(Module):
         self.omega = omega
         self.gamma = gamma
 
-    def derivative(self, t, state, inputs):
-        E, V = state
+    def derivative(self, t, state, inputs, out=None):
+        E, V = state.tolist()
         driving = inputs.get("em_drive", 0.0) if inputs else 0.0
         dE_dt = V
         dV_dt = -self.gamma * V - (self.omega ** 2) * E + driving
-        return np.array([dE_dt, dV_dt], dtype=float)
+        if out is None:
+            out = np.empty(2)
+        out[0] = dE_dt
+        out[1] = dV_dt
+        return out
 
     def step(self, dt, inputs=None):
-        try:
-            from .integrator import rk4_step
-            def f_wrap(t, y):
-                return self.derivative(t, y, inputs)
-            _, next_y = rk4_step(f_wrap, 0.0, self.state, dt)
-            self.state = next_y
-            return float(self.state[0])
-        except Exception:
+        if rk4_step_inplace is None:
+            # Euler fallback when the integrator is unavailable; in place,
+            # so get_state() views keep tracking the module
             deriv = self.derivative(0, self.state, inputs)
-            self.state = self.state + deriv * dt
+            self.state += deriv * dt
             return float(self.state[0])
+        rk4_step_inplace(self._rk4_rhs(inputs), 0.0, self.state, dt, *self._rk4_work(), self.state)
+        return float(self.state[0])
 
 # Backwards-compatibility alias
 EMFieldOscillator = EMOscillator
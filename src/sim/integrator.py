@@ -1,6 +1,36 @@
 import numpy as np
 from typing import Callable, Tuple
 
+
+__all__ = ["rk4_step", "rk4_step_inplace", "rk4_5d", "rk45_step", "integrate", "integrate_into", "integrate_views",
+           "integrate_adaptive", "sdirk2_step", "rk4"]
+
+# Below this length numpy's per-call overhead is lower than the compiled
+# kernels' dispatch, so short vectors keep the plain numpy expressions.
+FUSE_MIN_SIZE = 256
+
+# (rk4_axpy, rk4_combine) from integrator_numba, False without Numba. Bound by
+# _fusable on the first array that qualifies, so importing this module does
+# not import Numba: every state in the demo is far below FUSE_MIN_SIZE.
+_kernels = None
+
+
+def _fusable(*arrays) -> bool:
+    """True if the compiled single-pass RK4 kernels can take these arrays."""
+    global _kernels
+    y = arrays[0]
+    if not (_kernels is not False and type(y) is np.ndarray and y.size >= FUSE_MIN_SIZE):
+        return False
+    if not all(type(a) is np.ndarray and a.dtype == np.float64 and a.ndim == 1
+               and a.shape == y.shape for a in arrays):
+        return False
+    if _kernels is None:
+        from .integrator_numba import jit_kernels
+        compiled = jit_kernels()
+        _kernels = (compiled.rk4_axpy, compiled.rk4_combine) if compiled else False
+    return _kernels is not False
+
+
 # --------------------------------------------------------
 # Core RK4 Step
 # --------------------------------------------------------
@@ -17,14 +47,103 @@ def rk4_step(
     Returns (t+h, y_next)
     """
     k1 = f(t, y)
-    k2 = f(t + h/2.0, y + 0.5*h*k1)
-    k3 = f(t + h/2.0, y + 0.5*h*k2)
-    k4 = f(t + h, y + h*k3)
+    if _fusable(y, k1):
+        # float64 vectors: each stage input and the final update is one
+        # compiled pass (same rounding as the numpy expressions below)
+        rk4_axpy, rk4_combine = _kernels
+        k2 = f(t + h/2.0, rk4_axpy(y, 0.5*h, k1, np.empty_like(y)))
+        k3 = f(t + h/2.0, rk4_axpy(y, 0.5*h, k2, np.empty_like(y)))
+        k4 = f(t + h, rk4_axpy(y, h, k3, np.empty_like(y)))
+        if _fusable(y, k2, k3, k4):
+            return t + h, rk4_combine(y, h, k1, k2, k3, k4, np.empty_like(y))
+    else:
+        k2 = f(t + h/2.0, y + 0.5*h*k1)
+        k3 = f(t + h/2.0, y + 0.5*h*k2)
+        k4 = f(t + h, y + h*k3)
 
     y_next = y + (h/6.0) * (k1 + 2*k2 + 2*k3 + k4)
     return t + h, y_next
 
 
+# --------------------------------------------------------
+# Allocation-free RK4 Step (caller-owned scratch)
+# --------------------------------------------------------
+def rk4_step_inplace(
+    f: Callable[[float, np.ndarray, np.ndarray], np.ndarray],
+    t: float,
+    y: np.ndarray,
+    h: float,
+    k1: np.ndarray,
+    k2: np.ndarray,
+    k3: np.ndarray,
+    k4: np.ndarray,
+    ytmp: np.ndarray,
+    ynext: np.ndarray
+) -> float:
+    """
+    Single RK4 step that allocates nothing.
+    f : function f(t, y, out) writing dy/dt into out
+    k1..k4, ytmp : float scratch arrays shaped like y
+    ynext : receives y_next; may be y itself for an in-place update
+    Returns t+h. Same arithmetic (and rounding) as rk4_step.
+    """
+    f(t, y, k1)
+    np.multiply(k1, 0.5*h, out=ytmp)
+    ytmp += y
+    f(t + h/2.0, ytmp, k2)
+    np.multiply(k2, 0.5*h, out=ytmp)
+    ytmp += y
+    f(t + h/2.0, ytmp, k3)
+    np.multiply(k3, h, out=ytmp)
+    ytmp += y
+    f(t + h, ytmp, k4)
+
+    if _fusable(y, k1, k2, k3, k4, ynext):
+        _kernels[1](y, h, k1, k2, k3, k4, ynext)
+        return t + h
+
+    # ytmp = (h/6) * (k1 + 2*k2 + 2*k3 + k4); k1 is reused for 2*k3
+    np.multiply(k2, 2.0, out=ytmp)
+    ytmp += k1
+    np.multiply(k3, 2.0, out=k1)
+    ytmp += k1
+    ytmp += k4
+    ytmp *= h/6.0
+    np.add(y, ytmp, out=ynext)
+    return t + h
+
+
+# --------------------------------------------------------
+# RK4 Step specialised for a 5-component scalar state
+# --------------------------------------------------------
+def rk4_5d(
+    f5: Callable[..., Tuple[float, float, float, float, float]],
+    t: float,
+    y0: float, y1: float, y2: float, y3: float, y4: float,
+    h: float
+) -> Tuple[float, float, float, float, float, float]:
+    """
+    Single RK4 step on five unpacked scalars (e.g. [n, Ti, Te, E, V]).
+    f5 : function f5(t, y0, y1, y2, y3, y4) -> 5-tuple of derivatives
+    Returns (t+h, y0_next, ..., y4_next). No numpy arrays are created,
+    which for a 5-element state is far cheaper than rk4_step.
+    """
+    a1, b1, c1, d1, e1 = f5(t, y0, y1, y2, y3, y4)
+    hh = 0.5*h
+    a2, b2, c2, d2, e2 = f5(t + h/2.0, y0 + hh*a1, y1 + hh*b1, y2 + hh*c1, y3 + hh*d1, y4 + hh*e1)
+    a3, b3, c3, d3, e3 = f5(t + h/2.0, y0 + hh*a2, y1 + hh*b2, y2 + hh*c2, y3 + hh*d2, y4 + hh*e2)
+    a4, b4, c4, d4, e4 = f5(t + h, y0 + h*a3, y1 + h*b3, y2 + h*c3, y3 + h*d3, y4 + h*e3)
+    h6 = h/6.0
+    return (
+        t + h,
+        y0 + h6 * (a1 + 2*a2 + 2*a3 + a4),
+        y1 + h6 * (b1 + 2*b2 + 2*b3 + b4),
+        y2 + h6 * (c1 + 2*c2 + 2*c3 + c4),
+        y3 + h6 * (d1 + 2*d2 + 2*d3 + d4),
+        y4 + h6 * (e1 + 2*e2 + 2*e3 + e4),
+    )
+
+
 # --------------------------------------------------------
 # Full integrator: yields trajectory
 # --------------------------------------------------------
@@ -37,7 +156,7 @@ def integrate(
 ):
     """
     Integrate from t0 to t_final using RK4.
-    Yields (t, y)
+    Yields (t, y); every yielded y is a distinct array.
     """
     t = t0
     y = y0.copy()
@@ -45,8 +164,209 @@ def integrate(
 
     steps = int(np.ceil((t_final - t0) / dt))
     for _ in range(steps):
+        # rk4_step returns a fresh array, so no defensive copy is needed
         t, y = rk4_step(f, t, y, dt)
-        yield t, y.copy()
+        yield t, y
+
+
+def integrate_into(
+    f: Callable[[float, np.ndarray], np.ndarray],
+    t0: float,
+    y0: np.ndarray,
+    t_final: float,
+    dt: float,
+    out: np.ndarray
+) -> np.ndarray:
+    """
+    Integrate from t0 to t_final using RK4, writing the trajectory into
+    a preallocated array instead of yielding copies.
+    out : shape (steps + 1, 1 + len(y0)) with
+          steps = ceil((t_final - t0) / dt); row i is [t_i, *y_i]
+    Returns out.
+    """
+    steps = int(np.ceil((t_final - t0) / dt))
+    if out.shape[0] < steps + 1 or out.shape[1] != 1 + len(y0):
+        raise ValueError(f"out must have shape ({steps + 1}, {1 + len(y0)}), got {out.shape}")
+    t = t0
+    y = np.asarray(y0, dtype=float)
+    out[0, 0] = t
+    out[0, 1:] = y
+    for i in range(1, steps + 1):
+        t, y = rk4_step(f, t, y, dt)
+        out[i, 0] = t
+        out[i, 1:] = y
+    return out
+
+
+def integrate_views(
+    f: Callable[[float, np.ndarray, np.ndarray], np.ndarray],
+    t0: float,
+    y0: np.ndarray,
+    t_final: float,
+    dt: float
+):
+    """
+    Integrate from t0 to t_final using rk4_step_inplace.
+    f : function f(t, y, out) writing dy/dt into out
+    Yields (t, y) where y is the SAME array every time, updated in place;
+    copy it if you need to keep a snapshot past the next iteration.
+    """
+    t = t0
+    y = np.array(y0, dtype=float)
+    work = np.empty((5, y.size))
+    yield t, y
+
+    steps = int(np.ceil((t_final - t0) / dt))
+    for _ in range(steps):
+        t = rk4_step_inplace(f, t, y, dt, *work, y)
+        yield t, y
+
+
+# --------------------------------------------------------
+# Adaptive Dormand-Prince 5(4) step and integrator
+# --------------------------------------------------------
+_DP_A = (
+    (),
+    (1/5,),
+    (3/40, 9/40),
+    (44/45, -56/15, 32/9),
+    (19372/6561, -25360/2187, 64448/6561, -212/729),
+    (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+)
+_DP_C = (0.0, 1/5, 3/10, 4/5, 8/9, 1.0)
+_DP_B = (35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84)
+# 5th minus embedded 4th order weights (last entry multiplies the FSAL stage)
+_DP_E = (71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+
+
+def rk45_step(
+    f: Callable[[float, np.ndarray], np.ndarray],
+    t: float,
+    y: np.ndarray,
+    h: float,
+    k1: np.ndarray = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Single Dormand-Prince 5(4) step.
+    k1 : f(t, y) if already known (first-same-as-last from the previous step)
+    Returns (y_next, err, f(t+h, y_next)) where err is the difference
+    between the 5th and embedded 4th order solutions.
+    """
+    k = [f(t, y) if k1 is None else k1]
+    for c, a in zip(_DP_C[1:], _DP_A[1:]):
+        k.append(f(t + c*h, y + h * sum(ai * ki for ai, ki in zip(a, k))))
+    y_next = y + h * sum(bi * ki for bi, ki in zip(_DP_B, k) if bi)
+    k.append(f(t + h, y_next))
+    err = h * sum(ei * ki for ei, ki in zip(_DP_E, k) if ei)
+    return y_next, err, k[-1]
+
+
+def integrate_adaptive(
+    f: Callable[[float, np.ndarray], np.ndarray],
+    t0: float,
+    y0: np.ndarray,
+    t_eval: np.ndarray,
+    rtol: float = 1e-6,
+    atol: float = 1e-9,
+    h0: float = None,
+    out: np.ndarray = None
+) -> np.ndarray:
+    """
+    Integrate from t0 with error-controlled rk45_step steps and sample the
+    solution at the increasing times t_eval (all >= t0).
+    Steps are sized from rtol/atol, not from the t_eval spacing, so a smooth
+    solution is covered in far fewer steps than a fixed-dt RK4 run; values
+    between steps come from cubic Hermite interpolation.
+    out : optional preallocated array of shape (len(t_eval), len(y0))
+    Returns out with row i the state at t_eval[i].
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    y = np.array(y0, dtype=float)
+    if out is None:
+        out = np.empty((t_eval.size, y.size))
+    elif out.shape != (t_eval.size, y.size):
+        raise ValueError(f"out must have shape ({t_eval.size}, {y.size}), got {out.shape}")
+    if t_eval.size == 0:
+        return out
+    if rtol <= 0 or atol < 0:
+        raise ValueError("rtol must be > 0 and atol >= 0")
+
+    t = float(t0)
+    t_end = float(t_eval[-1])
+    h = h0 if h0 else max(t_end - t, 1e-12) * 1e-3
+    k1 = f(t, y)
+    j = 0
+    while j < t_eval.size:
+        if t_eval[j] <= t:
+            # only reachable for samples at t0 itself
+            out[j] = y
+            j += 1
+            continue
+        h = min(h, t_end - t)
+        y_new, err, k_new = rk45_step(f, t, y, h, k1)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err_norm = float(np.sqrt(np.mean((err / scale) ** 2)))
+        if err_norm > 1.0:
+            h *= max(0.2, 0.9 * err_norm ** -0.2)
+            continue
+
+        # accepted: fill every sample in (t, t + h] by Hermite interpolation
+        t_new = t + h
+        j_end = j + int(np.searchsorted(t_eval[j:], t_new, side="right"))
+        if j_end > j:
+            s = ((t_eval[j:j_end] - t) / h)[:, None]
+            out[j:j_end] = ((1 + 2*s) * (1 - s)**2 * y + s * (1 - s)**2 * (h*k1)
+                            + s*s * (3 - 2*s) * y_new + s*s * (s - 1) * (h*k_new))
+            j = j_end
+        t, y, k1 = t_new, y_new, k_new
+        h *= min(5.0, 0.9 * err_norm ** -0.2) if err_norm > 0 else 5.0
+    return out
+
+
+# --------------------------------------------------------
+# Implicit (L-stable) step for stiff problems
+# --------------------------------------------------------
+_SDIRK_GAMMA = 1.0 - 2.0**-0.5
+
+
+def sdirk2_step(
+    f: Callable[[float, np.ndarray], np.ndarray],
+    jac: Callable[[float, np.ndarray], np.ndarray],
+    t: float,
+    y: np.ndarray,
+    h: float,
+    newton_tol: float = 1e-10,
+    max_iter: int = 10
+) -> Tuple[float, np.ndarray]:
+    """
+    Single step of the two-stage, second order, L-stable SDIRK method
+    (Alexander), stable for any h on decaying modes where explicit RK4
+    needs h below ~2.8/|lambda|.
+    jac : function jac(t, y) -> analytic Jacobian df/dy
+    Each stage is solved by simplified Newton with the Jacobian evaluated
+    once per step. Newton stops once every update is below
+    newton_tol * max(|y_i|, 1).
+    Returns (t+h, y_next)
+    """
+    g = _SDIRK_GAMMA
+    y = np.asarray(y, dtype=float)
+    # both stages share the iteration matrix I - h*g*J
+    M_inv = np.linalg.inv(np.eye(y.size) - (h*g) * jac(t, y))
+
+    def solve_stage(tc, base):
+        # Y = base + h*g*f(tc, Y)
+        Y = base.copy()
+        for _ in range(max_iter):
+            dY = M_inv @ (base + (h*g) * f(tc, Y) - Y)
+            Y += dY
+            if np.all(np.abs(dY) <= newton_tol * np.maximum(np.abs(Y), 1.0)):
+                break
+        return Y
+
+    Y1 = solve_stage(t + g*h, y)
+    k1 = (Y1 - y) / (g*h)
+    # stiffly accurate: the second stage value is the new state
+    return t + h, solve_stage(t + h, y + (1.0 - g)*h*k1)
 
 
 # --------------------------------------------------------
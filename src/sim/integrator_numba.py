@@ -0,0 +1,627 @@
+"""
+Compiled kernels: single-pass RK4 array updates used by integrator.py for
+long float64 vectors, and the fast path for the default
+Fusion0D + EMOscillator + PID driver.
+
+The whole simulation loop (RK4 on the combined [n, Ti, Te, E, V] state plus
+the PID update) runs inside one Numba function on unpacked scalars, so no
+ndarray is allocated per step. Numba is optional and imported lazily: the
+module-level kernels are plain Python (main.py drives coupled_deriv through
+integrator.rk4_5d), and jit_kernels() returns their compiled versions,
+importing Numba on the first call. Importing Numba and loading the compiled
+kernels costs ~0.4 s, so callers only ask for them when a run is long
+enough to pay that back.
+"""
+
+import importlib.util
+import math
+import types
+
+import numpy as np
+
+__all__ = ["HAVE_NUMBA", "jit_kernels", "rk4_axpy", "rk4_combine", "fusion_params", "coupled_params",
+           "rates_core", "coupled_rates", "coupled_deriv", "coupled_jacobian", "coupled_step", "fusion_rk4", "pid_step",
+           "initial_state", "integrate_coupled", "coupled_deriv_batch", "integrate_batch", "integrate_ensemble",
+           "tuple_axpy", "tuple_rk4_combine", "tuple_from_row", "rk4_step_tuple", "integrate_tuple",
+           "integrate_tuple_batch", "Simulator"]
+
+# Whether Numba is installed, checked without importing it; jit_kernels()
+# clears it if the import then fails
+HAVE_NUMBA = importlib.util.find_spec("numba") is not None
+# plain range for the Python kernels; the compiled copies see numba.prange
+prange = range
+
+# name -> numba.njit options of every function marked with @_kernel
+_KERNEL_OPTIONS = {}
+# namespace of compiled kernels once jit_kernels() has run, False without Numba
+_compiled = None
+
+
+def _kernel(**options):
+    """
+    Mark a function as a Numba kernel compiled with the given njit options.
+    The module keeps the plain-Python function; jit_kernels() compiles it.
+    """
+    def mark(fn):
+        _KERNEL_OPTIONS[fn.__name__] = options
+        return fn
+    return mark
+
+
+def jit_kernels():
+    """
+    Compiled versions of the @_kernel functions of this module as a
+    namespace (jit_kernels().integrate_coupled, ...), or None without Numba.
+    The first call imports Numba and compiles the kernels (or loads them
+    from the on-disk cache); later calls return the same namespace.
+    """
+    global _compiled, HAVE_NUMBA
+    if _compiled is None:
+        try:
+            import numba
+        except ImportError:
+            HAVE_NUMBA = False
+            _compiled = False
+            return None
+        _register_tuple_overloads()
+        # copies of the kernels whose globals resolve to the compiled kernels
+        # (and to numba.prange), so a kernel calling a kernel compiles the
+        # call; the module-level functions stay plain Python
+        ns = dict(globals())
+        ns["prange"] = numba.prange
+        for name, options in _KERNEL_OPTIONS.items():
+            fn = globals()[name]
+            copy = types.FunctionType(fn.__code__, ns, fn.__name__, fn.__defaults__, fn.__closure__)
+            copy.__qualname__ = fn.__qualname__
+            copy.__doc__ = fn.__doc__
+            ns[name] = numba.njit(**options)(copy)
+        _compiled = types.SimpleNamespace(**{name: ns[name] for name in _KERNEL_OPTIONS})
+    return _compiled or None
+
+
+# All of Numba's fast-math flags except nnan/ninf: an unlimited PID integrator
+# is clamped to +/-inf, which those flags would allow LLVM to miscompile.
+FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# Physics constants of Fusion0D; module globals are compile-time constants
+# for Numba, so the kernels fold them
+MEV_TO_J = 1.602e-13        # MeV -> J
+T_FLOOR = 1e-6              # floor under sqrt(T) and in the temperature split
+N_HEAT_OFFSET = 1e6         # keeps the heat-capacity denominator n + 1e6 > 0
+PARTICLE_TAU_FACTOR = 100.0 # particle confinement time / energy confinement time
+POWER_SCALE = 1e-6          # reported fusion power scale (a.u.)
+
+# Layout of the float64 parameter vector built by coupled_params().
+# P_E_FUSION_J and P_TAU_N hold products that are loop-invariant, so the
+# derivative kernel does not recompute them at every RK4 stage.
+P_SIGMA_V, P_E_FUSION, P_BREMS, P_TAU_E, P_FUEL_INJECT, P_EM_COUPLING, \
+    P_ALPHA_ION, P_ALPHA_ELECTRON, P_OMEGA, P_GAMMA, P_KP, P_KI, P_KD, \
+    P_SETPOINT, P_I_LIMIT, P_E_FUSION_J, P_TAU_N = range(17)
+N_PARAMS = 17
+
+
+@_kernel(cache=True)
+def rk4_axpy(y, a, k, out):
+    """
+    out = y + a*k in one pass over 1-D float arrays (an RK4 stage input).
+    Compiled without fast-math so it rounds exactly like numpy.
+    """
+    for i in range(y.shape[0]):
+        out[i] = y[i] + a * k[i]
+    return out
+
+
+@_kernel(cache=True)
+def rk4_combine(y, h, k1, k2, k3, k4, out):
+    """
+    out = y + (h/6)*(k1 + 2*k2 + 2*k3 + k4) in one pass over 1-D float
+    arrays instead of seven numpy temporaries. Compiled without fast-math
+    so it rounds exactly like the numpy expression; out may alias y.
+    """
+    h6 = h/6.0
+    for i in range(y.shape[0]):
+        out[i] = y[i] + h6 * (k1[i] + 2*k2[i] + 2*k3[i] + k4[i])
+    return out
+
+
+def fusion_params(fusion):
+    """
+    Fusion0D parameters (and the loop-invariant products derived from
+    them) in the coupled parameter layout as a float tuple, EM and PID
+    slots zero, for fusion_rk4. A tuple unpacks to plain
+    floats in the pure-Python fallback and is a cheap argument for Numba.
+    """
+    p = [0.0] * N_PARAMS
+    p[P_SIGMA_V] = float(fusion.sigma_v_prefactor)
+    p[P_E_FUSION] = float(fusion.E_fusion)
+    p[P_BREMS] = float(fusion.brems_coeff)
+    p[P_TAU_E] = float(max(fusion.confinement_factor * fusion.B_field, 1e-6))
+    p[P_FUEL_INJECT] = float(fusion.fuel_inject_rate)
+    p[P_EM_COUPLING] = float(fusion.em_coupling)
+    p[P_ALPHA_ION] = float(fusion.alpha_heating_fraction_ion)
+    p[P_ALPHA_ELECTRON] = float(fusion.alpha_heating_fraction_electron)
+    p[P_E_FUSION_J] = p[P_E_FUSION] * MEV_TO_J
+    p[P_TAU_N] = PARTICLE_TAU_FACTOR * p[P_TAU_E]
+    return tuple(p)
+
+
+def coupled_params(fusion, em, pid, setpoint):
+    """
+    Pack module parameters into the flat float64 vector the kernels expect.
+    """
+    params = np.array(fusion_params(fusion), dtype=np.float64)
+    params[P_OMEGA] = em.omega
+    params[P_GAMMA] = em.gamma
+    params[P_KP] = pid.kp
+    params[P_KI] = pid.ki
+    params[P_KD] = pid.kd
+    params[P_SETPOINT] = setpoint
+    params[P_I_LIMIT] = pid.integrator_limit
+    return params
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def rates_core(n, Ti, Te, E, V, s_i, s_e, E_field, em_on, driving, p):
+    """
+    Right-hand side shared by coupled_rates and coupled_deriv_batch, given
+    s_i = sqrt(max(Ti, T_FLOOR)) and s_e = sqrt(max(Te, T_FLOOR)). Only
+    + - * / and ** are used, so the same code runs on floats (math.sqrt by
+    the caller) and on arrays over a batch (np.sqrt), with one rounding.
+    em_on : whether any E_field is nonzero; the EM heating split is only
+        evaluated then (adding its zero contribution would not change the
+        result)
+    """
+    n2 = n**2
+    sigma_v = p[P_SIGMA_V] * s_i
+    rate = n2 * sigma_v
+    P_fusion = rate * p[P_E_FUSION_J]
+    P_brems = p[P_BREMS] * n2 * s_e
+    tau_E = p[P_TAU_E]
+    n_heat = n + N_HEAT_OFFSET
+
+    heat_i = P_fusion * p[P_ALPHA_ION]
+    heat_e = P_fusion * p[P_ALPHA_ELECTRON]
+    if em_on:
+        P_em = p[P_EM_COUPLING] * E_field**2 * n
+        T_sum = Ti + Te + T_FLOOR
+        heat_i = heat_i + P_em * (Ti / T_sum)
+        heat_e = heat_e + P_em * (Te / T_sum)
+
+    dn_dt = -0.5 * n2 * sigma_v + p[P_FUEL_INJECT] - n / p[P_TAU_N]
+    dTi_dt = (heat_i - n * Ti / tau_E) / n_heat
+    dTe_dt = (heat_e - P_brems - n * Te / tau_E) / n_heat
+    dV_dt = -p[P_GAMMA] * V - p[P_OMEGA] ** 2 * E + driving
+    return dn_dt, dTi_dt, dTe_dt, V, dV_dt, rate
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def coupled_rates(n, Ti, Te, E, V, E_field, driving, p):
+    """
+    d/dt of [n, Ti, Te, E, V]: Fusion0D.derivative and
+    EMOscillator.derivative fused into one scalar kernel, followed by the
+    reaction term n**2 <sigma v> it computes on the way (times
+    E_fusion * POWER_SCALE it is the fusion power Fusion0D.step reports).
+    E_field is the plasma heating input, driving the oscillator drive.
+    Shared subexpressions (n**2, <sigma v>, temperature split) are
+    evaluated once, and the EM heating terms only for a nonzero E_field.
+    """
+    return rates_core(n, Ti, Te, E, V, math.sqrt(max(Ti, T_FLOOR)), math.sqrt(max(Te, T_FLOOR)),
+                      E_field, E_field != 0.0, driving, p)
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def coupled_deriv(n, Ti, Te, E, V, E_field, driving, p):
+    """d/dt of [n, Ti, Te, E, V] (coupled_rates without the reaction term)."""
+    dn_dt, dTi_dt, dTe_dt, dE_dt, dV_dt, _ = coupled_rates(n, Ti, Te, E, V, E_field, driving, p)
+    return dn_dt, dTi_dt, dTe_dt, dE_dt, dV_dt
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def coupled_jacobian(n, Ti, Te, E, V, E_field, driving, p):
+    """
+    Analytic Jacobian of coupled_deriv with respect to [n, Ti, Te, E, V]
+    (E_field and driving held fixed), as a new (5, 5) float64 array.
+    Below T_FLOOR the sqrt terms are constant, so their derivatives are 0.
+    """
+    J = np.zeros((5, 5))
+    n2 = n**2
+    s_i = math.sqrt(max(Ti, T_FLOOR))
+    s_e = math.sqrt(max(Te, T_FLOOR))
+    sigma_v = p[P_SIGMA_V] * s_i
+    dsigma_v = p[P_SIGMA_V] * 0.5 / s_i if Ti > T_FLOOR else 0.0
+    ds_e = 0.5 / s_e if Te > T_FLOOR else 0.0
+    tau_E = p[P_TAU_E]
+    T_sum = Ti + Te + T_FLOOR
+    T_sum2 = T_sum * T_sum
+    n_heat = n + N_HEAT_OFFSET
+
+    P_fusion = n2 * sigma_v * p[P_E_FUSION_J]
+    dPf_dn = 2.0 * n * sigma_v * p[P_E_FUSION_J]
+    dPf_dTi = n2 * dsigma_v * p[P_E_FUSION_J]
+    P_brems = p[P_BREMS] * n2 * s_e
+    dPb_dn = 2.0 * p[P_BREMS] * n * s_e
+    dPb_dTe = p[P_BREMS] * n2 * ds_e
+    dPem_dn = p[P_EM_COUPLING] * E_field**2
+    P_em = dPem_dn * n
+    f_i = Ti / T_sum
+    f_e = Te / T_sum
+
+    # dn/dt
+    J[0, 0] = -n * sigma_v - 1.0 / p[P_TAU_N]
+    J[0, 1] = -0.5 * n2 * dsigma_v
+    # dTi/dt = A / n_heat
+    A = P_fusion * p[P_ALPHA_ION] + P_em * f_i - n * Ti / tau_E
+    J[1, 0] = (dPf_dn * p[P_ALPHA_ION] + dPem_dn * f_i - Ti / tau_E) / n_heat - A / n_heat**2
+    J[1, 1] = (dPf_dTi * p[P_ALPHA_ION] + P_em * (Te + T_FLOOR) / T_sum2 - n / tau_E) / n_heat
+    J[1, 2] = -P_em * Ti / T_sum2 / n_heat
+    # dTe/dt = B / n_heat
+    B = P_fusion * p[P_ALPHA_ELECTRON] + P_em * f_e - P_brems - n * Te / tau_E
+    J[2, 0] = (dPf_dn * p[P_ALPHA_ELECTRON] + dPem_dn * f_e - dPb_dn - Te / tau_E) / n_heat - B / n_heat**2
+    J[2, 1] = (dPf_dTi * p[P_ALPHA_ELECTRON] - P_em * Te / T_sum2) / n_heat
+    J[2, 2] = (P_em * (Ti + T_FLOOR) / T_sum2 - dPb_dTe - n / tau_E) / n_heat
+    # oscillator
+    J[3, 4] = 1.0
+    J[4, 3] = -p[P_OMEGA] ** 2
+    J[4, 4] = -p[P_GAMMA]
+    return J
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def coupled_step(n, Ti, Te, E, V, h, p, k1):
+    """
+    One RK4 step of [n, Ti, Te, E, V] (the Fusion0D.step and
+    EMOscillator.step bodies on scalars). The EM field is not fed back
+    into the plasma and the oscillator is undriven, as in the driver.
+    k1 : coupled_deriv at the current state, which the caller already has
+        from the previous step's closing evaluation (first same as last)
+    """
+    a1, b1, c1, d1, e1 = k1
+    a2, b2, c2, d2, e2 = coupled_deriv(n + 0.5*h*a1, Ti + 0.5*h*b1, Te + 0.5*h*c1,
+                                       E + 0.5*h*d1, V + 0.5*h*e1, 0.0, 0.0, p)
+    a3, b3, c3, d3, e3 = coupled_deriv(n + 0.5*h*a2, Ti + 0.5*h*b2, Te + 0.5*h*c2,
+                                       E + 0.5*h*d2, V + 0.5*h*e2, 0.0, 0.0, p)
+    a4, b4, c4, d4, e4 = coupled_deriv(n + h*a3, Ti + h*b3, Te + h*c3,
+                                       E + h*d3, V + h*e3, 0.0, 0.0, p)
+    return (n + (h/6.0) * (a1 + 2*a2 + 2*a3 + a4),
+            Ti + (h/6.0) * (b1 + 2*b2 + 2*b3 + b4),
+            Te + (h/6.0) * (c1 + 2*c2 + 2*c3 + c4),
+            E + (h/6.0) * (d1 + 2*d2 + 2*d3 + d4),
+            V + (h/6.0) * (e1 + 2*e2 + 2*e3 + e4))
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def fusion_rk4(n, Ti, Te, h, E_field, p):
+    """
+    One RK4 step of Fusion0D on unpacked [n, Ti, Te] with a constant EM
+    heating field. Returns (n, Ti, Te, P_fusion) at the end of the step,
+    P_fusion as reported by Fusion0D.step.
+    """
+    a1, b1, c1, _, _ = coupled_deriv(n, Ti, Te, 0.0, 0.0, E_field, 0.0, p)
+    a2, b2, c2, _, _ = coupled_deriv(n + 0.5*h*a1, Ti + 0.5*h*b1, Te + 0.5*h*c1, 0.0, 0.0, E_field, 0.0, p)
+    a3, b3, c3, _, _ = coupled_deriv(n + 0.5*h*a2, Ti + 0.5*h*b2, Te + 0.5*h*c2, 0.0, 0.0, E_field, 0.0, p)
+    a4, b4, c4, _, _ = coupled_deriv(n + h*a3, Ti + h*b3, Te + h*c3, 0.0, 0.0, E_field, 0.0, p)
+    n = n + (h/6.0) * (a1 + 2*a2 + 2*a3 + a4)
+    Ti = Ti + (h/6.0) * (b1 + 2*b2 + 2*b3 + b4)
+    Te = Te + (h/6.0) * (c1 + 2*c2 + 2*c3 + c4)
+    return n, Ti, Te, n**2 * (p[P_SIGMA_V] * math.sqrt(max(Ti, T_FLOOR))) * p[P_E_FUSION] * POWER_SCALE
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def pid_step(integral, prev_err, measured, dt, p):
+    """
+    control.PID.step on scalars. prev_err is NaN before the first call
+    (PID._prev_error is None). Returns (output, integral, err).
+    """
+    err = p[P_SETPOINT] - measured
+    dedt = 0.0
+    if prev_err == prev_err and dt > 0:
+        dedt = (err - prev_err) / dt
+    integral = min(max(integral + err * dt, -p[P_I_LIMIT]), p[P_I_LIMIT])
+    return p[P_KP] * err + p[P_KI] * integral + p[P_KD] * dedt, integral, err
+
+
+def initial_state(fusion, em, pid):
+    """
+    Pack module state into the float64 vector integrate_coupled advances:
+    [n, Ti, Te, E, V, pid integral, pid previous error (NaN if none)].
+    """
+    prev_err = np.nan if pid._prev_error is None else pid._prev_error
+    return np.array([*fusion.state, *em.state, pid._integral, prev_err], dtype=np.float64)
+
+
+@_kernel(cache=True, fastmath=FASTMATH)
+def integrate_coupled(state, params, dt, nsteps, out):
+    """
+    Advance the driver state nsteps times and log each step into out.
+
+    state : vector from initial_state(); updated in place, so successive
+        calls continue the same run
+    out : shape (5, nsteps); rows are filled with temperature, density,
+        fusion_power, E_field and control_signal, matching the series
+        produced by main.run_simulation
+    """
+    p = params
+    n, Ti, Te, E, V, integral, prev_err = state
+    a1, b1, c1, d1, e1, _ = coupled_rates(n, Ti, Te, E, V, 0.0, 0.0, p)
+    for i in range(nsteps):
+        n, Ti, Te, E, V = coupled_step(n, Ti, Te, E, V, dt, p, (a1, b1, c1, d1, e1))
+        control, integral, prev_err = pid_step(integral, prev_err, Ti, dt, p)
+        # the next step's first stage also yields the logged fusion power
+        a1, b1, c1, d1, e1, rate = coupled_rates(n, Ti, Te, E, V, 0.0, 0.0, p)
+
+        out[0, i] = Ti
+        out[1, i] = n
+        out[2, i] = rate * p[P_E_FUSION] * POWER_SCALE
+        out[3, i] = E
+        out[4, i] = control
+
+    state[0] = n
+    state[1] = Ti
+    state[2] = Te
+    state[3] = E
+    state[4] = V
+    state[5] = integral
+    state[6] = prev_err
+
+
+# --------------------------------------------------------
+# Ensembles: many independent runs of the driver at once
+# --------------------------------------------------------
+def coupled_deriv_batch(n, Ti, Te, E, V, E_field, driving, p):
+    """
+    coupled_rates over arrays of independent members: the same rates_core
+    with numpy square roots, so each term is one numpy pass.
+    p : parameters of shape (N_PARAMS, B), one row per slot
+    """
+    return rates_core(n, Ti, Te, E, V, np.sqrt(np.maximum(Ti, T_FLOOR)), np.sqrt(np.maximum(Te, T_FLOOR)),
+                      E_field, bool(np.any(E_field)), driving, p)
+
+
+def integrate_batch(states, params, dt, nsteps, out):
+    """
+    integrate_coupled for B members at once with numpy operations over the
+    batch axis (no Numba needed).
+
+    states : shape (B, 7), rows from initial_state(); updated in place
+    params : shape (B, N_PARAMS), rows from coupled_params()
+    out : shape (5, B, nsteps); out[:, b] is member b's integrate_coupled log
+    """
+    p = np.ascontiguousarray(params.T)
+    n, Ti, Te, E, V, integral, prev_err = (states[:, j].copy() for j in range(7))
+    h = dt
+    hh = 0.5*h
+    h6 = h/6.0
+    a1, b1, c1, d1, e1, _ = coupled_deriv_batch(n, Ti, Te, E, V, 0.0, 0.0, p)
+    for i in range(nsteps):
+        a2, b2, c2, d2, e2, _ = coupled_deriv_batch(n + hh*a1, Ti + hh*b1, Te + hh*c1,
+                                                 E + hh*d1, V + hh*e1, 0.0, 0.0, p)
+        a3, b3, c3, d3, e3, _ = coupled_deriv_batch(n + hh*a2, Ti + hh*b2, Te + hh*c2,
+                                                 E + hh*d2, V + hh*e2, 0.0, 0.0, p)
+        a4, b4, c4, d4, e4, _ = coupled_deriv_batch(n + h*a3, Ti + h*b3, Te + h*c3,
+                                                 E + h*d3, V + h*e3, 0.0, 0.0, p)
+        n = n + h6 * (a1 + 2*a2 + 2*a3 + a4)
+        Ti = Ti + h6 * (b1 + 2*b2 + 2*b3 + b4)
+        Te = Te + h6 * (c1 + 2*c2 + 2*c3 + c4)
+        E = E + h6 * (d1 + 2*d2 + 2*d3 + d4)
+        V = V + h6 * (e1 + 2*e2 + 2*e3 + e4)
+
+        # pid_step over the batch; NaN prev_err marks a member's first call
+        err = p[P_SETPOINT] - Ti
+        dedt = np.where(prev_err == prev_err, (err - prev_err) / dt, 0.0) if dt > 0 else 0.0
+        integral = np.minimum(np.maximum(integral + err * dt, -p[P_I_LIMIT]), p[P_I_LIMIT])
+        prev_err = err
+        # first stage of the next step; its reaction term is the logged power
+        a1, b1, c1, d1, e1, rate = coupled_deriv_batch(n, Ti, Te, E, V, 0.0, 0.0, p)
+
+        out[0, :, i] = Ti
+        out[1, :, i] = n
+        out[2, :, i] = rate * p[P_E_FUSION] * POWER_SCALE
+        out[3, :, i] = E
+        out[4, :, i] = p[P_KP] * err + p[P_KI] * integral + p[P_KD] * dedt
+
+    for j, col in enumerate((n, Ti, Te, E, V, integral, prev_err)):
+        states[:, j] = col
+
+
+@_kernel(cache=True, parallel=True)
+def integrate_ensemble(states, params, dt, nsteps, out):
+    """
+    integrate_coupled for every member (states[b], params[b]) with members
+    spread over threads by prange; same arguments as integrate_batch.
+    Without Numba this is a plain loop over members.
+    """
+    for b in prange(states.shape[0]):
+        integrate_coupled(states[b], params[b], dt, nsteps, out[:, b])
+
+
+# --- Tuple-state RK4 ---------------------------------------------------------
+# A state held as a float tuple, e.g. (T,) or (n, Ti, Te), stays in registers
+# under Numba: a step allocates nothing, and the same code compiles for CUDA
+# devices. The tuple helpers are plain Python; jit_kernels() also gives each
+# one a nopython implementation on tuple_setitem, since the list form does
+# not compile.
+
+def tuple_axpy(y, a, k):
+    """y + a*k elementwise on equal-length float tuples."""
+    return tuple([yi + a * ki for yi, ki in zip(y, k)])
+
+
+def tuple_rk4_combine(y, h, k1, k2, k3, k4):
+    """y + (h/6)*(k1 + 2*k2 + 2*k3 + k4) elementwise on float tuples."""
+    h6 = h/6.0
+    return tuple([yi + h6 * (a + 2*b + 2*c + d) for yi, a, b, c, d in zip(y, k1, k2, k3, k4)])
+
+
+def tuple_from_row(like, row):
+    """The first len(like) values of the 1-D array row as a float tuple."""
+    return tuple([float(v) for v in row[:len(like)]])
+
+
+def _register_tuple_overloads():
+    """Nopython implementations of the tuple helpers; run once by jit_kernels()."""
+    from numba.extending import overload
+    from numba.cpython.unsafe.tuple import tuple_setitem
+
+    @overload(tuple_axpy, target="generic")
+    def _tuple_axpy(y, a, k):
+        def impl(y, a, k):
+            out = y
+            for i in range(len(y)):
+                out = tuple_setitem(out, i, y[i] + a * k[i])
+            return out
+        return impl
+
+    @overload(tuple_rk4_combine, target="generic")
+    def _tuple_rk4_combine(y, h, k1, k2, k3, k4):
+        def impl(y, h, k1, k2, k3, k4):
+            h6 = h/6.0
+            out = y
+            for i in range(len(y)):
+                out = tuple_setitem(out, i, y[i] + h6 * (k1[i] + 2*k2[i] + 2*k3[i] + k4[i]))
+            return out
+        return impl
+
+    @overload(tuple_from_row, target="generic")
+    def _tuple_from_row(like, row):
+        def impl(like, row):
+            out = like
+            for i in range(len(like)):
+                out = tuple_setitem(out, i, row[i])
+            return out
+        return impl
+
+
+@_kernel(cache=True)
+def rk4_step_tuple(f, t, y, h):
+    """
+    One RK4 step of dy/dt = f(t, y) on a float tuple y; f returns the
+    derivative as a tuple of the same length. Under Numba f must be @njit
+    too; the step is compiled per f and rounds like rk4_combine.
+    """
+    k1 = f(t, y)
+    k2 = f(t + 0.5*h, tuple_axpy(y, 0.5*h, k1))
+    k3 = f(t + 0.5*h, tuple_axpy(y, 0.5*h, k2))
+    k4 = f(t + h, tuple_axpy(y, h, k3))
+    return tuple_rk4_combine(y, h, k1, k2, k3, k4)
+
+
+@_kernel(cache=True)
+def integrate_tuple(f, t0, y, dt, nsteps, out):
+    """
+    nsteps rk4_step_tuple steps from the tuple y at t0. out has shape
+    (len(y), nsteps + 1) and receives the state at t0 + i*dt in column i.
+    Returns the final state tuple.
+    """
+    for j in range(len(y)):
+        out[j, 0] = y[j]
+    for i in range(nsteps):
+        y = rk4_step_tuple(f, t0 + i*dt, y, dt)
+        for j in range(len(y)):
+            out[j, i + 1] = y[j]
+    return y
+
+
+@_kernel(cache=True, parallel=True)
+def integrate_tuple_batch(f, t0, like, states, dt, nsteps, out):
+    """
+    integrate_tuple from every row of states (B, len(like)), with members
+    spread over threads by prange; out has shape (len(like), B, nsteps + 1).
+    like is any float tuple of the state length; only its type is used.
+    """
+    for b in prange(states.shape[0]):
+        integrate_tuple(f, t0, tuple_from_row(like, states[b]), dt, nsteps, out[:, b])
+
+
+def _cuda_batch_kernel(f):
+    """
+    integrate_tuple_batch as a CUDA kernel for the derivative f, one member
+    per thread. Device functions cannot take functions as arguments, so the
+    step closes over f compiled as a device function.
+    """
+    if jit_kernels() is None:
+        raise RuntimeError("target='cuda' requires numba")
+    from numba import cuda
+    if not cuda.is_available():
+        raise RuntimeError("target='cuda' requires a CUDA device")
+    f_dev = cuda.jit(device=True)(getattr(f, "py_func", f))
+
+    @cuda.jit(device=True)
+    def step(t, y, h):
+        k1 = f_dev(t, y)
+        k2 = f_dev(t + 0.5*h, tuple_axpy(y, 0.5*h, k1))
+        k3 = f_dev(t + 0.5*h, tuple_axpy(y, 0.5*h, k2))
+        k4 = f_dev(t + h, tuple_axpy(y, h, k3))
+        return tuple_rk4_combine(y, h, k1, k2, k3, k4)
+
+    @cuda.jit
+    def kernel(t0, like, states, dt, nsteps, out):
+        b = cuda.grid(1)
+        if b < states.shape[0]:
+            y = tuple_from_row(like, states[b])
+            for j in range(len(y)):
+                out[j, b, 0] = y[j]
+            for i in range(nsteps):
+                y = step(t0 + i*dt, y, dt)
+                for j in range(len(y)):
+                    out[j, b, i + 1] = y[j]
+
+    return kernel
+
+
+class Simulator:
+    """
+    Fixed-step RK4 on a tuple state for a user derivative f(t, y) -> tuple,
+    e.g. a single-temperature model with y = (T,).
+
+    target="cpu" runs integrate_tuple / integrate_tuple_batch: compiled
+    when f is a Numba @njit function, as plain Python otherwise. target="cuda"
+    compiles f as a device function and run_batch as a kernel with one
+    thread per member; it needs Numba and a CUDA device.
+    """
+
+    THREADS_PER_BLOCK = 128
+
+    def __init__(self, f, target="cpu"):
+        if target not in ("cpu", "cuda"):
+            raise ValueError("target must be 'cpu' or 'cuda'")
+        self.f = f
+        self.target = target
+        self._kernel = _cuda_batch_kernel(f) if target == "cuda" else None
+        # a Numba dispatcher (it has py_func) runs on the compiled loops
+        self._compiled = jit_kernels() if hasattr(f, "py_func") else None
+
+    def run(self, y0, dt, nsteps, t0=0.0):
+        """
+        Integrate from the state y0 (any float sequence). Returns (time, out)
+        with time of shape (nsteps + 1,) and out of shape (len(y0), nsteps + 1).
+        """
+        if self.target == "cuda":
+            time, out = self.run_batch([y0], dt, nsteps, t0)
+            return time, out[:, 0]
+        y0 = tuple([float(v) for v in y0])
+        out = np.empty((len(y0), nsteps + 1))
+        integrate = self._compiled.integrate_tuple if self._compiled else integrate_tuple
+        integrate(self.f, float(t0), y0, float(dt), int(nsteps), out)
+        return t0 + dt * np.arange(nsteps + 1), out
+
+    def run_batch(self, states, dt, nsteps, t0=0.0):
+        """
+        Integrate every row of states (B, dim) independently. Returns
+        (time, out) with out of shape (dim, B, nsteps + 1).
+        """
+        states = np.ascontiguousarray(states, dtype=np.float64)
+        if states.ndim != 2:
+            raise ValueError("states must have shape (B, dim)")
+        like = (0.0,) * states.shape[1]
+        out = np.empty((states.shape[1], states.shape[0], nsteps + 1))
+        if self._kernel is not None:
+            from numba import cuda
+            d_out = cuda.device_array(out.shape)
+            blocks = (states.shape[0] + self.THREADS_PER_BLOCK - 1) // self.THREADS_PER_BLOCK
+            self._kernel[blocks, self.THREADS_PER_BLOCK](float(t0), like, cuda.to_device(states), float(dt),
+                                                         int(nsteps), d_out)
+            d_out.copy_to_host(out)
+        else:
+            integrate = self._compiled.integrate_tuple_batch if self._compiled else integrate_tuple_batch
+            integrate(self.f, float(t0), like, states, float(dt), int(nsteps), out)
+        return t0 + dt * np.arange(nsteps + 1), out
@@ -11,14 +11,205 @@ import numpy as np
 from typing import Dict, Any
 
 from .fusion_module import Fusion0D
-from .em_module import EMFieldOscillator
+from .em_module import EMOscillator
 from .control import PID
+from .integrator_numba import (P_I_LIMIT, P_KD, P_KI, P_KP, P_OMEGA, P_GAMMA, P_EM_COUPLING,
+                               P_FUEL_INJECT, P_SETPOINT, P_TAU_E, P_TAU_N, PARTICLE_TAU_FACTOR,
+                               coupled_deriv, coupled_jacobian, coupled_params, initial_state, integrate_batch,
+                               jit_kernels)
+from .integrator import integrate_adaptive, rk4_5d, sdirk2_step
 # integrator.rk4 is available in the repo; not strictly required by this driver,
 # but left available for future use.
 from .integrator import rk4  # noqa: F401
 
+__all__ = ["RESULT_KEYS", "T_SETPOINT", "COMPILED_MIN_STEPS", "ENSEMBLE_PARAMS", "ENTRYPOINT", "run_simulation", "run_ensemble"]
 
-def run_simulation(total_time: float = 1.0, dt: float = 0.001, progress: bool = False) -> Dict[str, Any]:
+# Order of the series returned by run_simulation (and of the CSV columns)
+RESULT_KEYS = ("time", "temperature", "density", "fusion_power", "E_field", "control_signal")
+
+# PID setpoint for the plasma temperature (keV)
+T_SETPOINT = 5.0
+
+# Runs of at least this many steps (members x steps for run_ensemble) use the
+# compiled kernels when Numba is installed. Importing Numba and loading the
+# kernels takes ~0.4 s, longer than a shorter run needs in plain Python
+# (~6 us per step).
+COMPILED_MIN_STEPS = 100_000
+
+# run_ensemble parameters that may vary per member, with the slot they set in
+# the initial state vector ("state") or the coupled parameter vector ("param")
+ENSEMBLE_PARAMS = {
+    "n0": ("state", 0), "Ti0": ("state", 1), "Te0": ("state", 2), "E0": ("state", 3), "V0": ("state", 4),
+    "B_field": ("param", P_TAU_E), "fuel_inject_rate": ("param", P_FUEL_INJECT),
+    "em_coupling": ("param", P_EM_COUPLING), "omega": ("param", P_OMEGA), "gamma": ("param", P_GAMMA),
+    "kp": ("param", P_KP), "ki": ("param", P_KI), "kd": ("param", P_KD),
+    "integrator_limit": ("param", P_I_LIMIT), "setpoint": ("param", P_SETPOINT),
+}
+
+
+# The stock methods as defined at import. The kernel paths transcribe these;
+# a class-level patch (e.g. Fusion0D.step = ... in a notebook) replaces them,
+# and the run then goes through the generic module loop instead.
+_STOCK_METHODS = (
+    (Fusion0D, {name: getattr(Fusion0D, name) for name in ("step", "derivative", "get_sigma_v")}),
+    (EMOscillator, {name: getattr(EMOscillator, name) for name in ("step", "derivative")}),
+    (PID, {"step": PID.step}),
+)
+
+
+def _is_stock(fusion, em, pid) -> bool:
+    """
+    True when the modules are the stock ones mirrored by integrator_numba:
+    exactly the stock types, with none of their methods overridden since
+    import.
+    """
+    for module, (cls, methods) in zip((fusion, em, pid), _STOCK_METHODS):
+        if type(module) is not cls:
+            return False
+        if any(getattr(cls, name) is not fn for name, fn in methods.items()):
+            return False
+    return True
+
+
+def _stock_modules():
+    """The demo's module setup: (Fusion0D, EMOscillator, PID)."""
+    fusion = Fusion0D()            # must implement .step(dt) -> (T, n, pf) or similar
+    em = EMOscillator()            # must implement .step(dt) -> E
+    pid = PID(kp=5.0, ki=1.0, kd=0.1) # Tuned for more aggressive control
+    return fusion, em, pid
+
+
+def _time_grid(total_time: float, dt: float) -> np.ndarray:
+    """
+    Validated output time grid: t=0, dt, 2*dt, ... up to the multiple of dt
+    nearest total_time (the lower one on an exact half-step tie), so it ends
+    at total_time only when total_time is a multiple of dt.
+    """
+    if dt <= 0:
+        raise ValueError("dt must be > 0")
+    if total_time <= 0:
+        raise ValueError("total_time must be > 0")
+    # same point count as np.arange(0.0, total_time + 0.5*dt, dt), the
+    # original grid; linspace then places every point at i*dt without
+    # arange's accumulated drift
+    steps = int(np.ceil((total_time + dt * 0.5) / dt))
+    return np.linspace(0.0, (steps - 1) * dt, steps)
+
+
+def _report(i: int, steps: int, t: float) -> None:
+    """Progress line for step i of steps (simulation time t)."""
+    pct = int((i / max(1, steps - 1)) * 100)
+    print(f"[sim] {pct}%  t={t:.3f}s")
+
+
+def _log_trajectory(samples, steps: int, chunk: int = None, report=None) -> np.ndarray:
+    """
+    Shared driver of the Python integrator loops: collect one (Ti, n, E)
+    per step from the iterator samples into a float64 [Ti, n, E]
+    trajectory of shape (3, steps). If report is given it is called as
+    report(start) after every chunk steps, so the inner loop carries no
+    progress test.
+    """
+    traj = np.empty((3, steps))
+    # per-step names bound once: scalar stores into row views are much
+    # cheaper than assigning a tuple to a column
+    Ti_row, n_row, E_row = traj
+    chunk = chunk or steps
+    for start in range(0, steps, chunk):
+        for i, (Ti, n, E) in zip(range(start, min(start + chunk, steps)), samples):
+            Ti_row[i] = Ti
+            n_row[i] = n
+            E_row[i] = E
+        if report is not None:
+            report(start)
+    return traj
+
+
+def _fill_series(out: np.ndarray, fusion, pid, Ti: np.ndarray, n: np.ndarray, E: np.ndarray, dt: float) -> None:
+    """
+    Fill out (shape (5, steps), rows as in integrate_coupled) from float64
+    Ti, n and E trajectories. out may be a float32 buffer: n**2 would
+    overflow float32, so the derived series are computed from the inputs.
+    The PID output does not feed back into the plasma, so the control
+    series is one vectorized pass over the temperatures.
+    """
+    out[0] = Ti
+    out[1] = n
+    out[2] = fusion.fusion_power(n, Ti)
+    out[3] = E
+    out[4] = pid.step_series(T_SETPOINT, Ti, dt)
+
+
+def _run_scalar(fusion, em, pid, dt: float, steps: int, out: np.ndarray,
+                chunk: int = None, report=None) -> None:
+    """
+    Pure-Python loop for the stock modules (runs shorter than
+    COMPILED_MIN_STEPS, or without Numba):
+    integrator.rk4_5d on unpacked [n, Ti, Te, E, V] with the fused
+    coupled_deriv kernel, so no arrays are built per step. Fills out
+    like integrate_coupled; chunk and report as for _log_trajectory.
+    """
+    p = coupled_params(fusion, em, pid, T_SETPOINT).tolist()
+
+    def f5(t, n, Ti, Te, E, V, deriv=coupled_deriv):
+        return deriv(n, Ti, Te, E, V, 0.0, 0.0, p)
+
+    def samples(n, Ti, Te, E, V, step=rk4_5d):
+        t = 0.0
+        while True:
+            t, n, Ti, Te, E, V = step(f5, t, n, Ti, Te, E, V, dt)
+            yield Ti, n, E
+
+    traj = _log_trajectory(samples(*fusion.state.tolist(), *em.state.tolist()), steps, chunk, report)
+    _fill_series(out, fusion, pid, *traj, dt)
+
+
+def _run_adaptive(fusion, em, pid, time_grid: np.ndarray, dt: float, rtol: float,
+                  out: np.ndarray) -> None:
+    """
+    Error-controlled alternative to the fixed-step loops: the stock modules'
+    [n, Ti, Te, E, V] system is integrated with integrator.integrate_adaptive
+    (step size set by rtol, not dt) and sampled where the fixed-step loops
+    log, one dt after each grid time. Fills out like integrate_coupled.
+    """
+    p = tuple(coupled_params(fusion, em, pid, T_SETPOINT).tolist())
+
+    def f(t, y):
+        return np.array(coupled_deriv(*y.tolist(), 0.0, 0.0, p))
+
+    y0 = np.concatenate((fusion.state, em.state))
+    n, Ti, Te, E, V = integrate_adaptive(f, 0.0, y0, time_grid + dt, rtol=rtol).T
+    _fill_series(out, fusion, pid, Ti, n, E, dt)
+
+
+def _run_implicit(fusion, em, pid, dt: float, steps: int, out: np.ndarray,
+                  chunk: int = None, report=None) -> None:
+    """
+    Like _run_scalar, but each dt is one L-stable integrator.sdirk2_step
+    with the analytic coupled_jacobian, so dt is not limited by the
+    fastest decay rate (e.g. a short confinement time at low B_field).
+    """
+    p = tuple(coupled_params(fusion, em, pid, T_SETPOINT).tolist())
+
+    def f(t, y):
+        return np.array(coupled_deriv(*y.tolist(), 0.0, 0.0, p))
+
+    def jac(t, y):
+        return coupled_jacobian(*y.tolist(), 0.0, 0.0, p)
+
+    def samples(y, step=sdirk2_step):
+        t = 0.0
+        while True:
+            t, y = step(f, jac, t, y, dt)
+            n, Ti, _, E, _ = y.tolist()
+            yield Ti, n, E
+
+    traj = _log_trajectory(samples(np.concatenate((fusion.state, em.state))), steps, chunk, report)
+    _fill_series(out, fusion, pid, *traj, dt)
+
+
+def run_simulation(total_time: float = 1.0, dt: float = 0.001, progress: bool = False,
+                   dtype=np.float64, rtol: float = None, method: str = "rk4") -> Dict[str, Any]:
     """
     Run the deterministic multi-physics demo simulation.
 
@@ -26,80 +217,221 @@ def run_simulation(total_time: float = 1.0, dt: float = 0.001, progress: bool =
         total_time: total simulated time (seconds)
         dt: timestep (seconds)
         progress: if True print simple progress updates
+        dtype: floating dtype of the returned series; the physics is always
+            integrated in float64 (np.float32 halves the storage)
+        rtol: if given, integrate with adaptive Dormand-Prince steps at this
+            relative tolerance instead of one RK4 step per dt; dt then only
+            sets the output spacing (progress is not reported)
+        method: "rk4" (explicit, default) or "implicit" (L-stable SDIRK2
+            with an analytic Jacobian, for stiff parameter regimes where RK4
+            would need a much smaller dt)
+
+    The stock modules run on the scalar/compiled kernels. If a module
+    class's methods have been replaced (e.g. Fusion0D.step patched in a
+    notebook), every step goes through the modules' own step() methods
+    instead; rtol and method="implicit" need the stock modules.
 
     Returns:
         dict of numpy arrays: time, temperature, density, fusion_power, E_field, control_signal
     """
-    if dt <= 0:
-        raise ValueError("dt must be > 0")
-    if total_time <= 0:
-        raise ValueError("total_time must be > 0")
+    if np.dtype(dtype).kind != "f":
+        raise ValueError("dtype must be a floating point type")
+    if rtol is not None and rtol <= 0:
+        raise ValueError("rtol must be > 0")
+    if method not in ("rk4", "implicit"):
+        raise ValueError("method must be 'rk4' or 'implicit'")
+    if method == "implicit" and rtol is not None:
+        raise ValueError("rtol selects the adaptive explicit integrator; it cannot be combined with method='implicit'")
 
-    # build explicit time grid (includes t=0 and t=total_time)
-    time_grid = np.arange(0.0, total_time + dt * 0.5, dt)
+    # build explicit time grid (t=0 up to total_time in steps of dt)
+    time_grid = _time_grid(total_time, dt)
     steps = len(time_grid)
 
     # Initialize modules
-    fusion = Fusion0D()            # must implement .step(dt) -> (T, n, pf) or similar
-    em = EMFieldOscillator()       # must implement .step(dt) -> E
-    pid = PID(kp=5.0, ki=1.0, kd=0.1) # Tuned for more aggressive control
+    fusion, em, pid = _stock_modules()
+    stock = _is_stock(fusion, em, pid)
+    if not stock and (rtol is not None or method != "rk4"):
+        raise ValueError("rtol and method='implicit' integrate the stock physics; "
+                         "they are unavailable once a module's methods are overridden")
 
-    # Time series logs (pre-allocate lists)
-    t_series = []
-    T_series = []
-    n_series = []
-    pf_series = []
-    E_series = []
-    control_series = []
+    # Time series logs: one preallocated row per series (structure of arrays),
+    # so every returned column is a contiguous view into a single buffer
+    buf = np.empty((len(RESULT_KEYS), steps), dtype=dtype)
+    # the time axis is the grid itself; loops below only fill buf[1:]
+    buf[0] = time_grid
 
-    # Simulation loop
-    for i, t in enumerate(time_grid):
-        # --- Fusion plasma integration ---
-        # try to call fusion.step(dt) and accept either tuple or single value
-        fusion_out = fusion.step(dt)
-        if isinstance(fusion_out, tuple) and len(fusion_out) >= 3:
-            T, n, pf = fusion_out[0], fusion_out[1], fusion_out[2]
+    if rtol is not None:
+        _run_adaptive(fusion, em, pid, time_grid, dt, rtol, buf[1:])
+        return dict(zip(RESULT_KEYS, buf))
+
+    # progress is printed every 10% of the steps
+    report_every = max(1, steps // 10)
+
+    if stock:
+        # scalar fast paths; with progress they run in report_every-sized
+        # chunks and report in between, so no loop tests the flag per step
+        chunk = report_every if progress else steps
+        report = (lambda i: _report(i, steps, time_grid[i])) if progress else None
+        if method == "implicit":
+            _run_implicit(fusion, em, pid, dt, steps, buf[1:], chunk, report)
+        elif steps >= COMPILED_MIN_STEPS and jit_kernels() is not None:
+            # one compiled call per chunk; integrate_coupled resumes from state
+            integrate_coupled = jit_kernels().integrate_coupled
+            params = coupled_params(fusion, em, pid, T_SETPOINT)
+            state = initial_state(fusion, em, pid)
+            for start in range(0, steps, chunk):
+                stop = min(start + chunk, steps)
+                integrate_coupled(state, params, dt, stop - start, buf[1:, start:stop])
+                if report is not None:
+                    report(start)
         else:
-            # some toy modules may return (T,) or single value; be defensive
-            try:
-                T = float(fusion_out)
-            except Exception:
-                raise RuntimeError("fusion.step(dt) returned unexpected result; expected (T,n,pf) or numeric T")
-            n = 0.0
-            pf = 0.0
-
-        # --- EM oscillator ---
-        em_out = em.step(dt)
+            _run_scalar(fusion, em, pid, dt, steps, buf[1:], chunk, report)
+        return dict(zip(RESULT_KEYS, buf))
+
+    # Generic module loop for overridden modules: each step calls the
+    # modules' own step() methods, as the original driver did.
+    # measured temperatures in float64 for the PID pass after the loop
+    T_hist = np.empty(steps)
+    # row views bound once for the per-step scalar stores
+    T_row, n_row, pf_row, E_row = buf[1:5]
+    next_report = 0 if progress else steps
+
+    # --- Probe the step() contracts once, on the first step ---
+    # Loops below then run without per-step type dispatch; a module that
+    # breaks its contract mid-run fails in the numpy assignment instead.
+    fusion_out = fusion.step(dt)
+    if isinstance(fusion_out, tuple) and len(fusion_out) >= 3:
+        fusion_step = fusion.step
+    else:
+        # some toy modules may return (T,) or single value; be defensive
         try:
-            E = float(em_out)
+            T = float(fusion_out[0] if isinstance(fusion_out, tuple) else fusion_out)
         except Exception:
-            raise RuntimeError("em.step(dt) returned unexpected result; expected numeric E value")
+            raise RuntimeError("fusion.step(dt) returned unexpected result; expected (T,n,pf) or numeric T")
+        fusion_out = (T, 0.0, 0.0)
 
-        # --- Control system ---
-        control = pid.step(setpoint=5.0, measured=T, dt=dt)
+        def fusion_step(dt, _step=fusion.step):
+            out = _step(dt)
+            return (float(out[0] if isinstance(out, tuple) else out), 0.0, 0.0)
+
+    em_out = em.step(dt)
+    try:
+        E = float(em_out)
+    except Exception:
+        raise RuntimeError("em.step(dt) returned unexpected result; expected numeric E value")
+    em_step = em.step
+
+    # Simulation loop (step 0 was taken by the probe above)
+    for i, t in enumerate(time_grid):
+        if i:
+            # --- Fusion plasma integration / EM oscillator ---
+            fusion_out = fusion_step(dt)
+            E = em_step(dt)
+        T, n, pf = fusion_out[0], fusion_out[1], fusion_out[2]
 
         # --- Log data ---
-        t_series.append(t)
-        T_series.append(T)
-        n_series.append(n)
-        pf_series.append(pf)
-        E_series.append(E)
-        control_series.append(control)
-
-        # Simple progress printout (every 10%) if requested
-        if progress and (i % max(1, steps // 10) == 0):
-            pct = int((i / max(1, steps - 1)) * 100)
-            print(f"[sim] {pct}%  t={t:.3f}s")
-
-    # convert to numpy arrays and return
-    return {
-        "time": np.array(t_series),
-        "temperature": np.array(T_series),
-        "density": np.array(n_series),
-        "fusion_power": np.array(pf_series),
-        "E_field": np.array(E_series),
-        "control_signal": np.array(control_series)
-    }
+        T_hist[i] = T
+        T_row[i] = T
+        n_row[i] = n
+        pf_row[i] = pf
+        E_row[i] = E
+
+        # Simple progress printout (every 10%) if requested; next_report
+        # stays past the end when progress is off
+        if i == next_report:
+            _report(i, steps, t)
+            next_report += report_every
+
+    # --- Control system ---
+    # the controller output is logged but never fed back, so the whole
+    # series is one vectorized PID pass over the measured temperatures
+    # (or one step() call per sample when PID.step has been replaced)
+    if type(pid).step is _STOCK_METHODS[2][1]["step"]:
+        buf[5] = pid.step_series(T_SETPOINT, T_hist, dt)
+    else:
+        control_row = buf[5]
+        for i, T in enumerate(T_hist.tolist()):
+            control_row[i] = pid.step(setpoint=T_SETPOINT, measured=T, dt=dt)
+
+    return dict(zip(RESULT_KEYS, buf))
+
+
+def run_ensemble(params_batch: Dict[str, Any] = None, total_time: float = 1.0, dt: float = 0.001,
+                 target: str = "auto", dtype=np.float64) -> Dict[str, Any]:
+    """
+    Run B independent copies of the run_simulation setup in one call, e.g.
+    a sweep over PID gains or initial temperatures.
+
+    Args:
+        params_batch: maps names in ENSEMBLE_PARAMS to a scalar or a
+            length-B sequence; names not given keep the run_simulation
+            values (integrator_limit=np.inf means unlimited)
+        total_time, dt: as for run_simulation
+        target: "numpy" advances all members together with array operations
+            over the batch, "parallel" runs the compiled per-member loop
+            across threads (Numba prange; falls back to "numpy" without
+            Numba), "auto" picks "parallel" when Numba is installed and
+            B * steps >= COMPILED_MIN_STEPS
+        dtype: floating dtype of the (B, steps) series; np.float32 halves
+            the output, which dominates memory for large sweeps. Members
+            are always integrated in float64 (n**2 exceeds the float32
+            range once the density passes ~1.8e19 m^-3)
+
+    Returns:
+        dict with "time" of shape (steps,) and the other RESULT_KEYS of
+        shape (B, steps); row b equals run_simulation for member b
+    """
+    if target not in ("auto", "numpy", "parallel"):
+        raise ValueError("target must be 'auto', 'numpy' or 'parallel'")
+    if np.dtype(dtype).kind != "f":
+        raise ValueError("dtype must be a floating point type")
+
+    values = {}
+    for name, v in (params_batch or {}).items():
+        if name not in ENSEMBLE_PARAMS:
+            raise ValueError(f"unknown ensemble parameter {name!r}; expected one of {sorted(ENSEMBLE_PARAMS)}")
+        values[name] = np.asarray(v, dtype=np.float64)
+        if values[name].ndim > 1:
+            raise ValueError(f"ensemble parameter {name!r} must be a scalar or 1-D sequence")
+    sizes = {v.size for v in values.values() if v.ndim == 1}
+    if len(sizes) > 1:
+        raise ValueError("ensemble parameter sequences must all have the same length")
+    B = sizes.pop() if sizes else 1
+
+    time_grid = _time_grid(total_time, dt)
+    steps = len(time_grid)
+
+    # every member starts from the stock packing; overrides replace slots
+    fusion, em, pid = _stock_modules()
+    if not _is_stock(fusion, em, pid):
+        raise ValueError("run_ensemble integrates the stock physics; it is unavailable once a module's "
+                         "methods are overridden (use run_simulation per member)")
+    states = np.tile(initial_state(fusion, em, pid), (B, 1))
+    params = np.tile(coupled_params(fusion, em, pid, T_SETPOINT), (B, 1))
+    for name, v in values.items():
+        kind, slot = ENSEMBLE_PARAMS[name]
+        if name == "B_field":
+            # B_field only enters through the confinement times
+            v = np.maximum(fusion.confinement_factor * v, 1e-6)
+            params[:, P_TAU_N] = PARTICLE_TAU_FACTOR * v
+        elif name == "integrator_limit":
+            v = np.abs(v)
+        (states if kind == "state" else params)[:, slot] = v
+
+    if target == "auto":
+        target = "parallel" if B * steps >= COMPILED_MIN_STEPS else "numpy"
+    compiled = jit_kernels() if target == "parallel" else None
+
+    out = np.empty((len(RESULT_KEYS) - 1, B, steps), dtype=dtype)
+    if compiled is not None:
+        compiled.integrate_ensemble(states, params, dt, steps, out)
+    else:
+        integrate_batch(states, params, dt, steps, out)
+    return {"time": time_grid, **dict(zip(RESULT_KEYS[1:], out))}
+
+
+# Entrypoint picked up by run_sim.py without searching candidate names
+ENTRYPOINT = run_simulation
 
 
 if __name__ == "__main__":
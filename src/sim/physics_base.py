@@ -1,24 +1,100 @@
-from abc import ABC, abstractmethod
+import inspect
+
 import numpy as np
 
-class Module(ABC):
+__all__ = ["Module"]
+
+# derivative function -> whether it takes the out buffer; filled on first use
+_ACCEPTS_OUT = {}
+
+
+def _accepts_out(deriv) -> bool:
+    """
+    True if the bound derivative takes a fourth out argument. Modules
+    written against the original derivative(t, state, inputs) signature
+    return a fresh array instead.
+    """
+    func = getattr(deriv, "__func__", deriv)
+    accepts = _ACCEPTS_OUT.get(func)
+    if accepts is None:
+        try:
+            params = list(inspect.signature(deriv).parameters.values())
+        except (TypeError, ValueError):
+            params = []
+        positional = [q for q in params if q.kind in (q.POSITIONAL_ONLY, q.POSITIONAL_OR_KEYWORD)]
+        accepts = len(positional) >= 4 or any(q.kind is q.VAR_POSITIONAL for q in params)
+        _ACCEPTS_OUT[func] = accepts
+    return accepts
+
+class Module:
     """
     Base class for physics modules.
     Each module exposes:
       - state vector (numpy)
-      - derivative(t, state, external_inputs) -> ndarray
+      - derivative(t, state, external_inputs, out=None) -> ndarray
+        (fills and returns out; allocates it only when out is None).
+        The original derivative(t, state, external_inputs) form without
+        out is still accepted by the RK4 steps.
       - state_labels list for ordering
+    A plain base class (no ABC metaclass): subclasses are duck-typed and
+    must override derivative().
     """
     def __init__(self):
         self.state = np.zeros(0)
         self.state_labels = []
+        self._work = None
 
-    @abstractmethod
-    def derivative(self, t: float, state: np.ndarray, inputs: dict) -> np.ndarray:
-        pass
+    def derivative(self, t: float, state: np.ndarray, inputs: dict, out: np.ndarray = None) -> np.ndarray:
+        raise NotImplementedError(f"{type(self).__name__} must implement derivative()")
 
     def get_state(self) -> np.ndarray:
+        """
+        Read-only view of the state (no copy). It tracks later steps, which
+        update the state in place; use get_state_copy() for a snapshot.
+        """
+        view = self.state.view()
+        view.flags.writeable = False
+        return view
+
+    def get_state_copy(self) -> np.ndarray:
         return self.state.copy()
 
     def set_state(self, vec: np.ndarray):
-        self.state = vec.copy()
+        # copied into the existing buffer when the size matches, so the
+        # state array (and views of it) stay valid across set_state calls
+        vec = np.asarray(vec, dtype=float)
+        if vec.shape == self.state.shape:
+            self.state[...] = vec
+        else:
+            self.state = np.array(vec, dtype=float)
+
+    def _rk4_work(self) -> np.ndarray:
+        """
+        Scratch rows (k1, k2, k3, k4, ytmp) for integrator.rk4_step_inplace,
+        allocated once per module and reused by every step.
+        """
+        # getattr: subclasses that skip Module.__init__ have no _work yet
+        work = getattr(self, "_work", None)
+        if work is None or work.shape[1] != self.state.size:
+            work = self._work = np.empty((5, self.state.size))
+        return work
+
+    def _rk4_rhs(self, inputs) -> callable:
+        """
+        f(t, y, out) for integrator.rk4_step_inplace over derivative() with
+        the given inputs. A derivative without the out argument, or one that
+        returns a new array instead of filling out, has its result copied
+        into out.
+        """
+        deriv = self.derivative
+        if _accepts_out(deriv):
+            def f(t, y, out):
+                res = deriv(t, y, inputs, out)
+                if res is not out:
+                    out[:] = res
+                return out
+        else:
+            def f(t, y, out):
+                out[:] = deriv(t, y, inputs)
+                return out
+        return f
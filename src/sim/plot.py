@@ -7,11 +7,55 @@ Generates simple time-series graphs for diagnostics.
 import numpy as np
 import matplotlib.pyplot as plt
 
-def plot_fusion(results):
-    t = results["time"]
-    T = results["temperature"]
-    n = results["density"]
-    fusion_power = results["fusion_power"]
+__all__ = ["MAX_PLOT_POINTS", "THINNED_POINTS", "plot_fusion", "plot_em", "plot_control"]
+
+# Series up to this many points are plotted in full; longer ones are thinned
+MAX_PLOT_POINTS = 100_000
+# Points kept per line when a series is thinned; a screen-sized figure
+# cannot show more
+THINNED_POINTS = 10_000
+
+
+def _block_extrema(y, size):
+    """Indices of the minimum and maximum of y in each block of size points."""
+    full = len(y) // size * size
+    idx = []
+    if full:
+        blocks = y[:full].reshape(-1, size)
+        offsets = np.arange(0, full, size)
+        idx += [offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)]
+    if full < len(y):
+        tail = y[full:]
+        idx.append(np.array([full + tail.argmin(), full + tail.argmax()]))
+    return idx
+
+
+def _decimate(t, *series, max_points=MAX_PLOT_POINTS):
+    """
+    Return t and series as contiguous float arrays. Above max_points samples
+    (None never thins) they are cut to about min(max_points, THINNED_POINTS)
+    points: the first and last sample plus, in each block of samples, the
+    ones where any series has its minimum or maximum, so peaks and the
+    envelope of an oscillation survive where every-k-th striding would
+    alias. Contiguous inputs that need no thinning are passed through
+    without a copy.
+    """
+    arrays = [np.ascontiguousarray(a) for a in (t, *series)]
+    n = len(arrays[0])
+    if max_points is None or n <= max_points or not series:
+        return arrays
+    target = max(min(int(max_points), THINNED_POINTS), 1)
+    size = -(-n * 2 * len(series) // target)
+    idx = [np.array([0, n - 1])]
+    for y in arrays[1:]:
+        idx += _block_extrema(y, size)
+    keep = np.unique(np.concatenate(idx))
+    return [a[keep] for a in arrays]
+
+
+def plot_fusion(results, max_points=MAX_PLOT_POINTS):
+    t, T, fusion_power = _decimate(results["time"], results["temperature"],
+                                   results["fusion_power"], max_points=max_points)
 
     plt.figure(figsize=(10, 5))
     plt.plot(t, T, label="Ion Temperature (keV)")
@@ -23,9 +67,8 @@ def plot_fusion(results):
     plt.show()
 
 
-def plot_em(results):
-    t = results["time"]
-    E = results["E_field"]
+def plot_em(results, max_points=MAX_PLOT_POINTS):
+    t, E = _decimate(results["time"], results["E_field"], max_points=max_points)
 
     plt.figure(figsize=(10, 5))
     plt.plot(t, E, label="Electric Field", color="purple")
@@ -36,9 +79,8 @@ def plot_em(results):
     plt.show()
 
 
-def plot_control(results):
-    t = results["time"]
-    control = results["control_signal"]
+def plot_control(results, max_points=MAX_PLOT_POINTS):
+    t, control = _decimate(results["time"], results["control_signal"], max_points=max_points)
 
     plt.figure(figsize=(10, 5))
     plt.plot(t, control, label="PID Output", color="red")
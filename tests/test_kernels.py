@@ -0,0 +1,86 @@
+"""
+The physics is written out several times: Fusion0D.derivative and
+fusion_power (the readable module), coupled_rates and coupled_deriv_batch
+(the fused scalar and batch kernels over rates_core) and the power formula
+of fusion_rk4. These tests keep the copies in agreement.
+"""
+
+import unittest
+
+import numpy as np
+
+from src.sim.em_module import EMOscillator
+from src.sim.fusion_module import Fusion0D
+from src.sim.integrator_numba import (N_PARAMS, P_E_FUSION, POWER_SCALE, coupled_deriv, coupled_deriv_batch,
+                                      coupled_params, coupled_rates, fusion_params, fusion_rk4)
+from src.sim.control import PID
+
+# states around the floors (T below T_FLOOR, n near zero) and in the working range
+STATES = [
+    (1e19, 2.0, 2.0, 0.0, 0.0),
+    (3.2e19, 7.5, 4.1, 0.3, -1.2),
+    (1e3, 1e-8, 5e-7, -2.0, 0.5),
+    (5e20, 25.0, 30.0, 1.0, 1.0),
+]
+FIELDS = [(0.0, 0.0), (0.7, 0.0), (0.0, 1.5), (-2.0, 0.25)]
+
+
+def _params(**fusion_kw):
+    return coupled_params(Fusion0D(**fusion_kw), EMOscillator(omega=1.3, gamma=0.2), PID(), 5.0)
+
+
+class CoupledRatesTest(unittest.TestCase):
+
+    def test_batch_matches_scalar_per_member(self):
+        p = _params(B_field=3.0, em_coupling=0.4)
+        for E_field, driving in FIELDS:
+            cols = np.array(STATES).T
+            batch = coupled_deriv_batch(*cols, E_field, driving, np.repeat(p[:, None], len(STATES), axis=1))
+            for b, state in enumerate(STATES):
+                scalar = coupled_rates(*state, E_field, driving, p)
+                self.assertEqual(tuple(float(np.broadcast_to(x, (len(STATES),))[b]) for x in batch), scalar)
+
+    def test_batch_with_per_member_fields(self):
+        # the EM split is evaluated for all members once any field is nonzero
+        p = _params(em_coupling=0.4)
+        fields = np.array([0.0, 0.5, 0.0, -1.0])
+        batch = coupled_deriv_batch(*np.array(STATES).T, fields, 0.0, np.repeat(p[:, None], len(STATES), axis=1))
+        for b, state in enumerate(STATES):
+            scalar = coupled_rates(*state, float(fields[b]), 0.0, p)
+            np.testing.assert_allclose([x[b] for x in batch[:3]], scalar[:3], rtol=1e-15, atol=0.0)
+
+    def test_module_derivatives_match_kernel(self):
+        fusion = Fusion0D(B_field=3.0, em_coupling=0.4)
+        em = EMOscillator(omega=1.3, gamma=0.2)
+        p = coupled_params(fusion, em, PID(), 5.0)
+        for n, Ti, Te, E, V in STATES:
+            for E_field, driving in FIELDS:
+                expected = coupled_deriv(n, Ti, Te, E, V, E_field, driving, p)
+                dfus = fusion.derivative(0.0, np.array([n, Ti, Te]), {"E_field": E_field})
+                dem = em.derivative(0.0, np.array([E, V]), {"em_drive": driving})
+                np.testing.assert_allclose(np.concatenate([dfus, dem]), expected, rtol=1e-14, atol=0.0)
+
+    def test_fusion_power_formulas_agree(self):
+        fusion = Fusion0D()
+        p = fusion_params(fusion)
+        self.assertEqual(len(p), N_PARAMS)
+        for n, Ti, Te, _, _ in STATES:
+            n1, Ti1, Te1, power = fusion_rk4(n, Ti, Te, 0.01, 0.0, p)
+            self.assertEqual(power, float(fusion.fusion_power(n1, Ti1)))
+            rate = coupled_rates(n1, Ti1, Te1, 0.0, 0.0, 0.0, 0.0, p)[5]
+            self.assertEqual(power, rate * p[P_E_FUSION] * POWER_SCALE)
+
+    def test_fusion_rk4_matches_module_step(self):
+        stock = Fusion0D(em_coupling=0.4)
+        generic = Fusion0D(em_coupling=0.4)
+        # an instance attribute opts out of the kernel path; same physics
+        generic.derivative = generic.derivative
+        for _ in range(50):
+            a = stock.step(0.01, {"E_field": 0.8})
+            b = generic.step(0.01, {"E_field": 0.8})
+            np.testing.assert_allclose(a, b, rtol=1e-13, atol=0.0)
+        np.testing.assert_allclose(stock.state, generic.state, rtol=1e-13, atol=0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Driver, integrator and CSV writer checks: the fast paths of main and
+run_sim.py against the plain module step() loop and the csv module.
+"""
+
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import run_sim
+from src.sim import main
+from src.sim.control import PID
+from src.sim.em_module import EMOscillator
+from src.sim.fusion_module import Fusion0D
+from src.sim.integrator import integrate_adaptive, sdirk2_step
+from src.sim.integrator_numba import (HAVE_NUMBA, N_PARAMS, P_ALPHA_ELECTRON, P_ALPHA_ION, P_BREMS, P_E_FUSION_J,
+                                      P_EM_COUPLING, P_FUEL_INJECT, P_GAMMA, P_OMEGA, P_SIGMA_V, P_TAU_E, P_TAU_N,
+                                      coupled_deriv, coupled_jacobian)
+
+
+def _module_loop(total_time, dt, fusion=None, em=None, pid=None):
+    """The original driver: one step() call per module and step."""
+    fusion = fusion or Fusion0D()
+    em = em or EMOscillator()
+    pid = pid or PID(kp=5.0, ki=1.0, kd=0.1)
+    steps = len(main._time_grid(total_time, dt))
+    rows = []
+    for _ in range(steps):
+        T, n, pf = fusion.step(dt)
+        E = em.step(dt)
+        rows.append((T, n, pf, E, pid.step(setpoint=main.T_SETPOINT, measured=T, dt=dt)))
+    return dict(zip(main.RESULT_KEYS[1:], np.array(rows).T))
+
+
+class JacobianTest(unittest.TestCase):
+
+    def _check(self, E_field):
+        # O(1) rates: at the demo's scales (dn/dt ~ 1e18) the smaller entries
+        # are below the rounding of a finite difference
+        p = np.ones(N_PARAMS)
+        p[[P_SIGMA_V, P_BREMS, P_FUEL_INJECT, P_TAU_E, P_TAU_N]] = 1e-12, 3e-13, 1e5, 0.7, 70.0
+        p[[P_E_FUSION_J, P_EM_COUPLING, P_ALPHA_ION, P_ALPHA_ELECTRON, P_OMEGA, P_GAMMA]] = 2.0, 0.5, 0.4, 0.6, 2.0, 0.05
+        y = np.array([2.0e6, 6.0, 4.5, 0.3, -0.8])
+        J = coupled_jacobian(*y, E_field, 0.0, p)
+        for j in range(5):
+            h = 1e-5 * max(abs(y[j]), 1.0)
+            hi, lo = y.copy(), y.copy()
+            hi[j] += h
+            lo[j] -= h
+            fd = (np.array(coupled_deriv(*hi, E_field, 0.0, p)) - np.array(coupled_deriv(*lo, E_field, 0.0, p))) / (2*h)
+            np.testing.assert_allclose(J[:, j], fd, rtol=1e-5, atol=1e-12, err_msg=f"column {j}")
+
+    def test_finite_differences_without_field(self):
+        self._check(0.0)
+
+    def test_finite_differences_with_field(self):
+        self._check(1.7)
+
+
+class RunSimulationTest(unittest.TestCase):
+
+    def test_matches_module_loop(self):
+        res = main.run_simulation(total_time=2.0, dt=0.01)
+        ref = _module_loop(2.0, 0.01)
+        np.testing.assert_array_equal(res["time"], main._time_grid(2.0, 0.01))
+        for key, series in ref.items():
+            np.testing.assert_allclose(res[key], series, rtol=1e-12, atol=1e-12, err_msg=key)
+
+    def test_patched_module_takes_generic_loop(self):
+        stock_step = Fusion0D.step
+        calls = []
+
+        def step(self, dt, inputs=None):
+            calls.append(dt)
+            return stock_step(self, dt, inputs)
+
+        with mock.patch.object(Fusion0D, "step", step):
+            res = main.run_simulation(total_time=0.5, dt=0.01)
+        self.assertEqual(len(calls), len(res["time"]))
+        ref = _module_loop(0.5, 0.01)
+        for key, series in ref.items():
+            np.testing.assert_allclose(res[key], series, rtol=1e-12, atol=1e-12, err_msg=key)
+
+    def test_implicit_and_adaptive_track_rk4(self):
+        ref = main.run_simulation(total_time=1.0, dt=0.001)
+        for kwargs in ({"method": "implicit"}, {"rtol": 1e-8}):
+            res = main.run_simulation(total_time=1.0, dt=0.001, **kwargs)
+            np.testing.assert_allclose(res["temperature"], ref["temperature"], rtol=1e-5, err_msg=str(kwargs))
+
+
+class RunEnsembleTest(unittest.TestCase):
+
+    def test_rows_match_single_runs(self):
+        batch = {"kp": [5.0, 1.0, 8.0], "Ti0": [2.0, 3.5, 1.0], "B_field": [5.0, 2.0, 7.0]}
+        targets = ["numpy"] + (["parallel"] if HAVE_NUMBA else [])
+        for target in targets:
+            res = main.run_ensemble(batch, total_time=1.0, dt=0.01, target=target)
+            np.testing.assert_array_equal(res["time"], main._time_grid(1.0, 0.01))
+            for b in range(3):
+                ref = _module_loop(1.0, 0.01, fusion=Fusion0D(Ti0=batch["Ti0"][b], B_field=batch["B_field"][b]),
+                                   pid=PID(kp=batch["kp"][b], ki=1.0, kd=0.1))
+                for key, series in ref.items():
+                    np.testing.assert_allclose(res[key][b], series, rtol=1e-12, atol=1e-12,
+                                               err_msg=f"{target} member {b} {key}")
+
+    def test_default_member_is_run_simulation(self):
+        res = main.run_ensemble({"kp": [5.0, 2.0]}, total_time=1.0, dt=0.01, target="numpy")
+        single = main.run_simulation(total_time=1.0, dt=0.01)
+        for key in main.RESULT_KEYS[1:]:
+            np.testing.assert_allclose(res[key][0], single[key], rtol=1e-14, atol=0.0, err_msg=key)
+
+
+class ImplicitAndAdaptiveTest(unittest.TestCase):
+
+    @staticmethod
+    def _decay(lam):
+        return (lambda t, y: lam * y), (lambda t, y: np.array([[lam]]))
+
+    def _sdirk_error(self, h, lam=-2.0, t_end=1.0):
+        f, jac = self._decay(lam)
+        t, y = 0.0, np.array([1.0])
+        for _ in range(round(t_end / h)):
+            t, y = sdirk2_step(f, jac, t, y, h)
+        return abs(y[0] - np.exp(lam * t_end))
+
+    def test_sdirk2_is_second_order(self):
+        errs = [self._sdirk_error(h) for h in (0.02, 0.01, 0.005)]
+        for coarse, fine in zip(errs, errs[1:]):
+            self.assertAlmostEqual(coarse / fine, 4.0, delta=0.2)
+
+    def test_sdirk2_damps_stiff_modes(self):
+        # h * |lambda| = 1e3, far past the explicit RK4 stability limit
+        f, jac = self._decay(-1e4)
+        t, y = 0.0, np.array([1.0])
+        for _ in range(10):
+            t, y = sdirk2_step(f, jac, t, y, 0.1)
+        self.assertLess(abs(y[0]), 1e-6)
+
+    def test_adaptive_accuracy_and_step_count(self):
+        calls = [0]
+
+        def f(t, y):
+            calls[0] += 1
+            return np.array([y[1], -y[0]])
+
+        t_eval = np.linspace(0.0, 10.0, 10_001)
+        for rtol in (1e-6, 1e-9):
+            calls[0] = 0
+            out = integrate_adaptive(f, 0.0, [1.0, 0.0], t_eval, rtol=rtol, atol=1e-12)
+            err = np.abs(out[:, 0] - np.cos(t_eval)).max()
+            self.assertLess(err, 100 * rtol)
+            # far fewer evaluations than one RK4 step (4 calls) per sample
+            self.assertLess(calls[0], 4 * t_eval.size / 10)
+
+    def test_adaptive_samples_at_t0(self):
+        out = integrate_adaptive(lambda t, y: -y, 0.0, [2.0], [0.0, 1.0])
+        self.assertEqual(out[0, 0], 2.0)
+        self.assertAlmostEqual(out[1, 0], 2.0 * np.exp(-1.0), places=6)
+
+
+class SaveCsvTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def _roundtrip(self, ts):
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_sim.save_timeseries_csv(ts, self.path)
+        with open(self.path, newline="") as fh:
+            return list(csv.reader(fh))
+
+    def test_float_table(self):
+        rows = self._roundtrip({"time": np.array([0.0, 0.5]), "x": np.array([1.25, 1e-20])})
+        self.assertEqual(rows, [["time", "x"], ["0", "1.25"], ["0.5", "1e-20"]])
+
+    def test_quoted_header_and_cells(self):
+        rows = self._roundtrip({"time": [0.0, 1.0], "a,b": ['say "hi"', "x\ny"]})
+        self.assertEqual(rows, [["time", "a,b"], ["0.0", 'say "hi"'], ["1.0", "x\ny"]])
+
+    def test_ragged_columns_are_padded(self):
+        rows = self._roundtrip({"time": [0.0, 1.0, 2.0], "short": [5.0]})
+        self.assertEqual(rows, [["time", "short"], ["0.0", "5.0"], ["1.0", ""], ["2.0", ""]])
+
+    def test_bool_and_int_columns_keep_their_values(self):
+        big = 2**53 + 1
+        rows = self._roundtrip({"time": np.array([0.0, 0.25]), "flag": np.array([True, False]),
+                                "count": np.array([big, -3])})
+        self.assertEqual(rows, [["time", "flag", "count"], ["0", "True", str(big)], ["0.25", "False", "-3"]])
+
+    def test_records_transpose(self):
+        cols = run_sim.records_to_columns([{"t": 0.0, "T": 1.0}, {"t": 1.0, "T": 2.0}])
+        self.assertEqual(cols, {"t": [0.0, 1.0], "T": [1.0, 2.0]})
+        self.assertIsNone(run_sim.records_to_columns([{"t": 0.0}, {"T": 1.0}]))
+
+
+if __name__ == "__main__":
+    unittest.main()